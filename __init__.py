@@ -1,7 +1,36 @@
-from element import Element
-from material import Material
-from mesh import Mesh
-from model import Model
-from node import Node
-from particle import Particle
-from plot import Plot
+from .boundary_conditions import BoundaryConditions
+from .cell_sort import CellSort
+from .checkpoint import Checkpoint
+from .constitutive_model import ConstitutiveModel, Elastic, ElastoPlastic, ViscoElastic
+from .decomposition import DomainDecomposition
+from .disk_recorder import DiskRecorder
+from .element import Element
+from .engine import Engine
+from .ensemble import Ensemble
+from .grid import Grid
+from .interpolation import Interpolation
+from .material import Material
+from .mesh import Mesh
+from .model import Model
+from .node import Node
+from .observer import CenterOfMass, KineticEnergy, MaxStress, Observer, Probe, StrainEnergy
+from .particle import Particle
+from .particle_set import ParticleSet
+from .progress import Progress
+from .profiler import Profiler
+from .recorder import Recorder
+from .sweep import Sweep
+from .time_step import AdaptiveTimeStep
+
+__all__ = ['AdaptiveTimeStep', 'BoundaryConditions', 'CellSort', 'CenterOfMass', 'Checkpoint', 'ConstitutiveModel',
+           'DiskRecorder', 'DomainDecomposition', 'Elastic', 'ElastoPlastic', 'Element', 'Engine', 'Ensemble', 'Grid',
+           'Interpolation', 'KineticEnergy', 'Material', 'MaxStress', 'Mesh', 'Model', 'Node', 'Observer', 'Particle',
+           'ParticleSet', 'Plot', 'Probe', 'Profiler', 'Progress', 'Recorder', 'StrainEnergy', 'Sweep', 'ViscoElastic']
+
+
+def __getattr__(name: str):
+    # Plot is imported on first use, so importing the package does not import matplotlib.
+    if name == 'Plot':
+        from .plot import Plot
+        return Plot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,17 @@
+class ArrayField:
+    """Attribute that reads and writes one entry of a struct-of-arrays field.
+
+    The owner object must define ``_data`` (the object holding the arrays) and ``_index`` (its position in them).
+    """
+    name: str
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj._data, self.name)[obj._index]
+
+    def __set__(self, obj, value):
+        getattr(obj._data, self.name)[obj._index] = value
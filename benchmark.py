@@ -0,0 +1,212 @@
+"""Headless benchmarks of the solver.
+
+Times `Model.step_solve` and `Model.solve` over the number of elements, particles per element, number of steps and
+recording stride, and writes throughput (particle updates per second) and peak traced memory as JSON. Also times the
+import of the package in a fresh interpreter, as paid by every worker process.
+
+Usage, from the directory that contains the package:
+python -m mpm.benchmark [--quick] [--repeat N] [--output FILE] [--baseline FILE [--tolerance T]] [--import-budget S]
+
+With --baseline, cases whose throughput dropped more than the tolerance against a previous JSON report are listed
+and the exit status is 1. The exit status is also 1 if the import takes longer than the budget or imports matplotlib.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .model import Model
+from .progress import Progress
+from .recorder import Recorder
+from .sweep import build_bar
+
+
+def build(num_els: int, num_particles_per_el: int, num_steps: int, engine: str) -> Model:
+    """Return the bar of example_2 with elements of unit length, so dt = 0.01 and num_steps steps are solved."""
+    return build_bar(num_els=num_els, num_particles_per_el=num_particles_per_el, length=num_els,
+                     total_time=0.01 * num_steps, engine=engine)
+
+
+def measure(run, repeat: int, setup=None) -> tuple[float, int]:
+    """Return the best wall time of `repeat` calls of `run` and the peak memory traced in one call. A first call
+    is neither timed nor traced, so one-time costs such as imports are left out.
+
+    :param run: Function to measure, called with the value returned by `setup` if given.
+    :param repeat: Number of timed calls.
+    :param setup: Function called before each call of `run` and outside the measurements, e.g. to build a model.
+    """
+    def args() -> tuple:
+        return () if setup is None else (setup(),)
+
+    run(*args())
+
+    a = args()
+    tracemalloc.start()
+    run(*a)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        a = args()
+        start = time.perf_counter()
+        run(*a)
+        times.append(time.perf_counter() - start)
+
+    return min(times), peak
+
+
+def bench_step(num_els: int, num_particles_per_el: int, engine: str, repeat: int) -> dict:
+    """Benchmark one call of `Model.step_solve`."""
+    model = build(num_els, num_particles_per_el, 1, engine)
+    seconds, peak = measure(model.step_solve, repeat)
+    n = len(model.particle_set)
+
+    return {'kind': 'step_solve', 'engine': engine, 'num_els': num_els, 'num_particles_per_el': num_particles_per_el,
+            'num_particles': n, 'num_steps': 1, 'stride': None, 'seconds': seconds,
+            'particle_updates_per_second': n / seconds, 'peak_memory_bytes': peak}
+
+
+def bench_solve(num_els: int, num_particles_per_el: int, num_steps: int, stride: int, engine: str,
+                repeat: int) -> dict:
+    """Benchmark `Model.solve` recording positions and velocities every `stride` steps. The models are built
+    outside the measurements."""
+    def run(model: Model):
+        model.solve(Recorder(stride=stride), progress=Progress(quiet=True))
+
+    seconds, peak = measure(run, repeat, lambda: build(num_els, num_particles_per_el, num_steps, engine))
+    n = num_els * num_particles_per_el
+
+    return {'kind': 'solve', 'engine': engine, 'num_els': num_els, 'num_particles_per_el': num_particles_per_el,
+            'num_particles': n, 'num_steps': num_steps, 'stride': stride, 'seconds': seconds,
+            'particle_updates_per_second': n * num_steps / seconds, 'peak_memory_bytes': peak}
+
+
+def bench_import(repeat: int) -> dict:
+    """Benchmark the import of the package in fresh interpreters and check that it does not import matplotlib."""
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {__package__}\n"
+            "print(time.perf_counter() - start, 'matplotlib' in sys.modules)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=root, check=True)
+        seconds, matplotlib = out.stdout.split()
+        times.append(float(seconds))
+
+    return {'kind': 'import', 'seconds': min(times), 'matplotlib': matplotlib == 'True'}
+
+
+def cases(quick: bool) -> list[tuple]:
+    """Return the benchmark cases as (function name, arguments), each once."""
+    num_els = [100, 1000] if quick else [100, 1000, 10000, 100000]
+    ppe = [1, 4] if quick else [1, 2, 4, 8]
+    steps = [100] if quick else [100, 1000]
+    strides = [1, 100] if quick else [1, 10, 100]
+
+    c = [('step', (n, p, 'vectorized')) for n in num_els for p in ppe]
+    c += [('step', (n, 2, 'sparse')) for n in num_els]
+    c += [('step', (n, 2, 'threaded')) for n in num_els]
+    c += [('step', (n, 2, 'object')) for n in num_els[:2]]
+    c += [('solve', (1000, 2, s, k, 'vectorized')) for s in steps for k in strides]
+    c += [('solve', (n, 2, steps[0], 1, 'vectorized')) for n in num_els[:3]]
+
+    # The mesh sizes of the solve cases include the one of the stride cases.
+    return list(dict.fromkeys(c))
+
+
+def git_commit() -> str | None:
+    """Return the current git commit of the repository, if available."""
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[tuple[dict, float]]:
+    """Return the results slower than the same case of the baseline by more than the tolerance, with their ratio."""
+    def key(r):
+        return tuple(r[k] for k in ('kind', 'engine', 'num_els', 'num_particles_per_el', 'num_steps', 'stride'))
+
+    base = {key(r): r['particle_updates_per_second'] for r in baseline}
+    slower = []
+    for r in results:
+        if key(r) in base:
+            ratio = r['particle_updates_per_second'] / base[key(r)]
+            if ratio < 1 - tolerance:
+                slower.append((r, ratio))
+
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='run a reduced set of cases')
+    parser.add_argument('--repeat', type=int, default=3, help='timed repetitions of each case (best is kept)')
+    parser.add_argument('--output', help='JSON file of the results (default: standard output)')
+    parser.add_argument('--baseline', help='JSON report of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='accepted relative drop of throughput')
+    parser.add_argument('--import-budget', type=float, default=0.5, help='accepted seconds to import the package')
+    args = parser.parse_args()
+
+    imported = bench_import(args.repeat)
+    print(f"{'import':>10} {imported['seconds']:.3f} s matplotlib={imported['matplotlib']}", flush=True)
+
+    functions = {'step': bench_step, 'solve': bench_solve}
+    results = []
+    for name, case in cases(args.quick):
+        r = functions[name](*case, repeat=args.repeat)
+        results.append(r)
+        print(f"{r['kind']:>10} {r['engine']:>10} n_p={r['num_particles']:>7} steps={r['num_steps']:>5} "
+              f"stride={r['stride']} {r['particle_updates_per_second']:.3e} updates/s "
+              f"{r['peak_memory_bytes'] / 2 ** 20:.1f} MiB", flush=True)
+
+    report = {'commit': git_commit(),
+              'date': datetime.now(timezone.utc).isoformat(),
+              'python': platform.python_version(),
+              'numpy': np.__version__,
+              'machine': platform.machine(),
+              'quick': args.quick,
+              'repeat': args.repeat,
+              'import': imported,
+              'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    failed = False
+    if imported['seconds'] > args.import_budget or imported['matplotlib']:
+        print(f"IMPORT BUDGET {imported['seconds']:.3f} s of {args.import_budget} s, "
+              f"matplotlib={imported['matplotlib']}", file=sys.stderr)
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        slower = regressions(results, baseline['results'], args.tolerance)
+        for r, ratio in slower:
+            print(f"REGRESSION {r['kind']} {r['engine']} n_p={r['num_particles']} steps={r['num_steps']} "
+                  f"stride={r['stride']}: {ratio:.2f}x of {baseline['commit']}", file=sys.stderr)
+        failed = failed or bool(slower)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+from typing import Callable, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .grid import Grid
+
+# Value of a condition: a scalar, one value for each node, or a function of time that returns one of them.
+Value = float | np.ndarray | Callable[[float | np.ndarray], float | np.ndarray]
+
+
+class BoundaryConditions:
+    velocity_nodes: np.ndarray
+    velocity_values: np.ndarray
+    velocity_functions: list[tuple[int, int, Callable]]
+    traction_nodes: np.ndarray
+    traction_values: np.ndarray
+    traction_functions: list[tuple[int, int, Callable]]
+    version: int
+
+    def __init__(self):
+        """Constructor. Prescribed velocities and tractions of the mesh nodes, stored as arrays of node indices and
+        values. Fixed nodes are the `is_fixed` mask of the grid.
+
+        Time-dependent conditions are functions of time, called once per step for all their nodes. With an ensemble
+        of members with different time steps, they receive an array with the time of each node.
+
+        `version` counts the conditions prescribed, so copies of them, e.g. in an ensemble, know when they are
+        out of date.
+        """
+        self.velocity_nodes = np.zeros(0, dtype=int)
+        self.velocity_values = np.zeros(0)
+        self.velocity_functions = []
+        self.traction_nodes = np.zeros(0, dtype=int)
+        self.traction_values = np.zeros(0)
+        self.traction_functions = []
+        self.version = 0
+
+    def __str__(self):
+        n_velocity = f"n_velocity={len(self.velocity_nodes)}"
+        n_traction = f"n_traction={len(self.traction_nodes)}"
+
+        return f"{self.__class__.__name__}({n_velocity}, {n_traction})"
+
+    def prescribe_velocity(self, nodes: int | np.ndarray, velocity: Value):
+        """Impose the velocity of nodes, e.g. a moving end of the bar.
+
+        :param nodes: Index or indices of the nodes.
+        :param velocity: Velocity, one velocity for each node or a function of time that returns them.
+        """
+        self.velocity_nodes, self.velocity_values = self.add(self.velocity_nodes, self.velocity_values,
+                                                             self.velocity_functions, nodes, velocity)
+        self.version += 1
+
+    def prescribe_traction(self, nodes: int | np.ndarray, force: Value):
+        """Apply an external force on nodes, e.g. a load on an end of the bar.
+
+        :param nodes: Index or indices of the nodes.
+        :param force: Force, one force for each node or a function of time that returns them.
+        """
+        self.traction_nodes, self.traction_values = self.add(self.traction_nodes, self.traction_values,
+                                                             self.traction_functions, nodes, force)
+        self.version += 1
+
+    @staticmethod
+    def add(nodes: np.ndarray, values: np.ndarray, functions: list[tuple[int, int, Callable]],
+            new_nodes: int | np.ndarray, value: Value) -> tuple[np.ndarray, np.ndarray]:
+        """Return the node and value arrays of a kind of condition extended with new nodes.
+
+        :param nodes: Nodes of the condition.
+        :param values: Values of the condition.
+        :param functions: Time-dependent entries of the condition, extended in place.
+        :param new_nodes: Index or indices of the new nodes.
+        :param value: Value of the new nodes, or a function of time.
+        """
+        new_nodes = np.atleast_1d(np.asarray(new_nodes, dtype=int))
+        if callable(value):
+            functions.append((len(nodes), len(nodes) + len(new_nodes), value))
+            value = 0
+
+        return (np.concatenate([nodes, new_nodes]),
+                np.concatenate([values, np.broadcast_to(np.asarray(value, dtype=float), new_nodes.shape)]))
+
+    @staticmethod
+    def evaluate(nodes: np.ndarray, values: np.ndarray, functions: list[tuple[int, int, Callable]],
+                 time: float | np.ndarray) -> np.ndarray:
+        """Return the values of a kind of condition at a time.
+
+        :param nodes: Nodes of the condition.
+        :param values: Values of the condition, used for the entries that do not depend on time.
+        :param functions: Time-dependent entries of the condition.
+        :param time: Time, or time of each node of the grid.
+        """
+        if not functions:
+            return values
+
+        values = values.copy()
+        for start, stop, f in functions:
+            values[start:stop] = f(time if np.ndim(time) == 0 else time[nodes[start:stop]])
+        return values
+
+    def velocity(self, time: float | np.ndarray) -> np.ndarray:
+        """Return the prescribed velocity of each node of `velocity_nodes` at a time.
+
+        :param time: Time, or time of each node of the grid.
+        """
+        return self.evaluate(self.velocity_nodes, self.velocity_values, self.velocity_functions, time)
+
+    def traction(self, time: float | np.ndarray) -> np.ndarray:
+        """Return the external force of each node of `traction_nodes` at a time.
+
+        :param time: Time, or time of each node of the grid.
+        """
+        return self.evaluate(self.traction_nodes, self.traction_values, self.traction_functions, time)
+
+    def apply_to_momentum(self, grid: 'Grid', time: float | np.ndarray):
+        """Set the momentum of the nodes with prescribed velocity from their mass.
+
+        :param grid: Grid with the mapped mass and momentum.
+        :param time: Time, or time of each node of the grid.
+        """
+        if len(self.velocity_nodes):
+            n = self.velocity_nodes
+            grid.momentum[n] = grid.mass[n] * self.velocity(time)
+
+    def apply_to_force(self, grid: 'Grid', time: float | np.ndarray, dt: float | np.ndarray):
+        """Add the external forces and set the force of the nodes with prescribed velocity to the one that brings
+        them to their velocity at the end of the step.
+
+        :param grid: Grid with the mapped mass and internal force.
+        :param time: Time, or time of each node of the grid.
+        :param dt: Time step, or time step of each node.
+        """
+        if len(self.traction_nodes):
+            np.add.at(grid.force, self.traction_nodes, self.traction(time))
+
+        if len(self.velocity_nodes):
+            n = self.velocity_nodes
+            change = self.velocity(time + dt) - self.velocity(time)
+            dt = dt[n] if np.ndim(dt) else np.full(len(n), dt)
+            grid.force[n] = grid.mass[n] * np.divide(change, dt, out=np.zeros(len(n)), where=dt > 0)
+
+    def constant(self) -> 'BoundaryConditions':
+        """Return the conditions that do not depend on time."""
+        new = BoundaryConditions()
+        for kind in ('velocity', 'traction'):
+            nodes = getattr(self, f'{kind}_nodes')
+            keep = np.ones(len(nodes), dtype=bool)
+            for start, stop, _ in getattr(self, f'{kind}_functions'):
+                keep[start:stop] = False
+            setattr(new, f'{kind}_nodes', nodes[keep])
+            setattr(new, f'{kind}_values', getattr(self, f'{kind}_values')[keep])
+
+        return new
+
+    def subset(self, first: int, last: int) -> 'BoundaryConditions':
+        """Return the conditions of a range of nodes, numbered from the first one.
+
+        :param first: First node of the range.
+        :param last: Last node of the range.
+        """
+        new = BoundaryConditions()
+        for kind in ('velocity', 'traction'):
+            nodes = getattr(self, f'{kind}_nodes')
+            inside = (nodes >= first) & (nodes <= last)
+            setattr(new, f'{kind}_nodes', nodes[inside] - first)
+            setattr(new, f'{kind}_values', getattr(self, f'{kind}_values')[inside])
+
+            for start, stop, f in getattr(self, f'{kind}_functions'):
+                selected = inside[start:stop]
+                if selected.any():
+                    def restricted(t, f=f, selected=selected):
+                        return np.broadcast_to(f(t), selected.shape)[selected]
+
+                    new_start = np.count_nonzero(inside[:start])
+                    getattr(new, f'{kind}_functions').append((new_start, new_start + np.count_nonzero(selected),
+                                                              restricted))
+
+        return new
+
+    @classmethod
+    def join(cls, conditions: list['BoundaryConditions'], offsets: list[int]) -> 'BoundaryConditions':
+        """Return the conditions of grids joined one after the other.
+
+        :param conditions: Conditions of each grid.
+        :param offsets: Index of the first node of each grid in the joined grid.
+        """
+        new = cls()
+        for kind in ('velocity', 'traction'):
+            functions = getattr(new, f'{kind}_functions')
+            start = 0
+            for c in conditions:
+                functions.extend((start + i, start + j, f) for i, j, f in getattr(c, f'{kind}_functions'))
+                start += len(getattr(c, f'{kind}_nodes'))
+
+            setattr(new, f'{kind}_nodes', np.concatenate([getattr(c, f'{kind}_nodes') + offset
+                                                          for c, offset in zip(conditions, offsets)]))
+            setattr(new, f'{kind}_values', np.concatenate([getattr(c, f'{kind}_values') for c in conditions]))
+
+        return new
@@ -0,0 +1,67 @@
+import numpy as np
+
+from .interpolation import Interpolation
+from .particle_set import ParticleSet
+
+
+class CellSort:
+    every_steps: int
+    cell_start: np.ndarray
+    num_sorts: int
+
+    def __init__(self, every_steps: int = 100):
+        """Constructor. Reorder the particle arrays by the element that contains each particle.
+
+        Particles of the same element become contiguous and follow the node order, so the mappings to the nodes
+        access memory sequentially. The reordering is stable and keeps the particle IDs, so recorded results and
+        the `Particle` objects of the model are not affected.
+
+        :param every_steps: Sort at every multiple of this number of steps.
+        """
+        if every_steps < 1:
+            raise ValueError(f"every_steps must be a positive integer, not {every_steps}.")
+
+        self.every_steps = every_steps
+        self.cell_start = np.zeros(1, dtype=int)
+        self.num_sorts = 0
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(every_steps={self.every_steps}, n_sorts={self.num_sorts})"
+
+    def due(self, step_index: int) -> bool:
+        """Return True if the particles are sorted before the step.
+
+        :param step_index: Index of the next time step.
+        """
+        return step_index % self.every_steps == 0
+
+    def sort(self, particles: ParticleSet, interpolation: Interpolation) -> bool:
+        """Sort the particles by element and index the range of particles of each element.
+
+        The range of element i is `cell_start[i]:cell_start[i + 1]`, counted from the number of particles in each
+        element. Particles keep their relative order inside each element.
+
+        :param particles: Particles to sort.
+        :param interpolation: Interpolation cache, used to locate the particles.
+        :return: True if the particles were out of order and have been permuted.
+        """
+        interpolation.locate(particles.x)
+        cells = interpolation.cells
+
+        counts = np.bincount(cells, minlength=len(interpolation.grid) - 1)
+        self.cell_start = np.concatenate([[0], np.cumsum(counts)])
+
+        if np.all(cells[1:] >= cells[:-1]):
+            return False
+
+        # Particles stay nearly sorted between two sorts, which the stable sort handles in close to linear time.
+        particles.reorder(np.argsort(cells, kind='stable'))
+        self.num_sorts += 1
+        return True
+
+    def cell_range(self, cell: int) -> slice:
+        """Return the slice of the particles of an element after the last sort.
+
+        :param cell: Index of the element.
+        """
+        return slice(int(self.cell_start[cell]), int(self.cell_start[cell + 1]))
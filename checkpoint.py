@@ -0,0 +1,216 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from .constitutive_model import MODELS
+from .disk_recorder import DiskRecorder
+from .material import Material
+from .mesh import Mesh
+from .model import Model
+from .observer import OBSERVERS
+from .particle_set import ParticleSet
+from .recorder import Recorder
+from .time_step import AdaptiveTimeStep
+
+
+class Checkpoint:
+    path: str
+    every_steps: int | None
+    every_seconds: float | None
+    start_step: int
+    last_save: float
+
+    def __init__(self, path: str, every_steps: int | None = None, every_seconds: float | None = None):
+        """Constructor. Write the full state of a model to a binary file during `Model.solve`.
+
+        The file is an uncompressed .npz with the particle, node and element arrays written in bulk and a JSON
+        description of the model, the current time, step index and recorder position. Records of a `DiskRecorder`
+        are already on disk, so only its position is saved; records of an in-memory `Recorder` are saved with the
+        state. Every save replaces the previous file atomically.
+
+        :param path: Checkpoint file.
+        :param every_steps: Save at every multiple of this number of steps.
+        :param every_seconds: Save when this wall time has passed since the last save.
+        """
+        if every_steps is None and every_seconds is None:
+            raise ValueError("Give every_steps, every_seconds or both.")
+
+        self.path = path
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+
+        self.start_step = 0
+        self.last_save = time.monotonic()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(path='{self.path}', every_steps={self.every_steps}, " \
+               f"every_seconds={self.every_seconds})"
+
+    def start(self, step_index: int = 0):
+        """Start counting the intervals between saves. Called at the beginning of the solution.
+
+        :param step_index: Index of the first step of the solution.
+        """
+        self.start_step = step_index
+        self.last_save = time.monotonic()
+
+    def due(self, step_index: int) -> bool:
+        """Return True if the state before the step must be saved.
+
+        :param step_index: Index of the next time step.
+        """
+        if step_index == self.start_step:
+            return False
+        if self.every_steps is not None and step_index % self.every_steps == 0:
+            return True
+        return self.every_seconds is not None and time.monotonic() - self.last_save >= self.every_seconds
+
+    def save(self, model: Model):
+        """Write the current state of the model.
+
+        :param model: Model between two time steps.
+        """
+        ps = model.particle_set
+        materials = {}
+        for m in model.mesh.materials + ps.materials:
+            materials.setdefault(id(m), (len(materials), m))
+        mesh_ids = np.array([materials[id(m)][0] for m in model.mesh.materials], dtype=int)
+        particle_ids = np.array([materials[id(m)][0] for m in ps.materials] + [-1], dtype=int)
+
+        arrays = {f'particles.{f}': getattr(ps, f) for f in ParticleSet.FIELDS}
+        arrays['particles.material'] = particle_ids[ps.material_id]
+        if ps.positions is not None:
+            arrays['particles.positions'] = ps.positions
+        arrays['grid.is_fixed'] = model.mesh.grid.is_fixed
+        conditions = model.mesh.grid.conditions.constant()
+        for kind in ('velocity', 'traction'):
+            arrays[f'conditions.{kind}_nodes'] = getattr(conditions, f'{kind}_nodes')
+            arrays[f'conditions.{kind}_values'] = getattr(conditions, f'{kind}_values')
+        arrays['elements.material'] = mesh_ids[model.mesh.material_ids]
+        arrays['elements.volume'] = np.array([el.volume for el in model.mesh.elements])
+
+        result = model.result
+        if isinstance(result, DiskRecorder):
+            result.flush()
+        else:
+            n = result.num_recorded
+            arrays.update({f'result.{k}': v[:n] for k, v in result.data.items()})
+            arrays.update({f'result.{k}': v[:n] for k, v in result.series.items()})
+            arrays['result.initial_mass'] = result.initial_mass
+
+        for i, o in enumerate(model.observers):
+            if o.__class__.__name__ not in OBSERVERS:
+                raise ValueError(f"Observer {o.__class__.__name__} is not in OBSERVERS and cannot be restored.")
+            arrays[f'observers.{i}.values'] = o.values[:o.num_observed]
+            arrays[f'observers.{i}.times'] = o.time()
+
+        state = {'model': model.metadata(),
+                 'mesh_coordinates': model.mesh.coordinates is not None,
+                 'materials': [{'density': m.rho, 'young': m.young, 'model': m.model.name,
+                                'parameters': m.model.parameters()} for _, m in materials.values()],
+                 'initial_dt': model.initial_dt,
+                 'dt': model.dt,
+                 'time': model.time,
+                 'step_index': model.step_index,
+                 'observers': [{'class': o.__class__.__name__, 'parameters': o.parameters()} for o in model.observers],
+                 'result': {'disk': isinstance(result, DiskRecorder),
+                            'path': getattr(result, 'path', None),
+                            'fields': result.fields,
+                            'stride': result.stride,
+                            'dtype': result.dtype.str,
+                            'num_recorded': result.num_recorded,
+                            'dt': result.dt,
+                            'metadata': result.metadata}}
+
+        if model.mesh.coordinates is not None:
+            arrays['mesh.coordinates'] = model.mesh.coordinates
+
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, state=np.array(json.dumps(state)), **arrays)
+        os.replace(tmp, self.path)
+
+        self.last_save = time.monotonic()
+
+    @staticmethod
+    def load(path: str) -> Model:
+        """Return the model saved in a checkpoint file, ready to continue with `model.solve(resume=True)`.
+        Time-dependent boundary conditions are functions and are not saved, so prescribe them again before resuming.
+        Observers are restored with their series in `model.observers`.
+
+        :param path: Checkpoint file.
+        """
+        with np.load(path) as f:
+            arrays = dict(f)
+        state = json.loads(str(arrays.pop('state')))
+        meta = state['model']
+
+        materials = [Material(m['density'], m['young'], MODELS[m.get('model', 'elastic')](**m.get('parameters', {})))
+                     for m in state['materials']]
+
+        if state['mesh_coordinates']:
+            mesh = Mesh.from_coordinates(arrays['mesh.coordinates'])
+        else:
+            mesh = Mesh(meta['mesh']['x_ini'], meta['mesh']['x_final'], meta['mesh']['num_els'])
+
+        el_materials = arrays['elements.material']
+        mesh.generate_mesh(materials[el_materials[0]])
+        for el, volume in zip(mesh.elements, arrays['elements.volume']):
+            el.volume = volume
+        mesh.set_materials(materials, el_materials)
+        mesh.grid.is_fixed[:] = arrays['grid.is_fixed']
+        if 'conditions.velocity_nodes' in arrays:
+            mesh.grid.conditions.prescribe_velocity(arrays['conditions.velocity_nodes'],
+                                                    arrays['conditions.velocity_values'])
+            mesh.grid.conditions.prescribe_traction(arrays['conditions.traction_nodes'],
+                                                    arrays['conditions.traction_values'])
+
+        adaptive = meta['adaptive_dt']
+        model = Model(mesh, meta['num_particles_per_el'], meta['total_time'], engine=meta['engine'],
+                      out_of_domain=meta['out_of_domain'], cfl=meta['cfl'],
+                      adaptive_dt=None if adaptive is None else AdaptiveTimeStep(**adaptive),
+                      scheme=meta.get('scheme', 'usl'), basis=meta.get('basis', 'linear'),
+                      seeding=meta.get('seeding', 'uniform'), seed=meta.get('seed'))
+
+        ps = ParticleSet(meta['num_particles'])
+        for f in ParticleSet.FIELDS:
+            getattr(ps, f)[:] = arrays[f'particles.{f}']
+        ps.materials = materials
+        ps.material_id[:] = arrays['particles.material']
+        if 'particles.positions' in arrays:
+            ps.positions = arrays['particles.positions']
+        model.set_particles(ps)
+
+        model.initial_dt = state.get('initial_dt', model.initial_dt)
+        model.dt = state['dt']
+        model.time = state['time']
+        model.step_index = state['step_index']
+
+        r = state['result']
+        if r['disk']:
+            model.result = DiskRecorder.open(r['path'], mode='r+')
+        else:
+            model.result = Recorder(tuple(r['fields']), r['stride'], r['dtype'])
+            model.result.data = {k: arrays[f'result.{k}'] for k in model.result.fields}
+            model.result.series = {k: arrays[f'result.{k}'] for k in Recorder.SERIES}
+            model.result.initial_mass = arrays['result.initial_mass']
+            model.result.dt = r['dt']
+            model.result.metadata = r['metadata']
+        model.result.num_recorded = r['num_recorded']
+
+        model.observers = []
+        for i, o in enumerate(state.get('observers', [])):
+            observer = OBSERVERS[o['class']](**o['parameters'])
+            observer.allocate(model.number_of_steps())
+            values, times = arrays[f'observers.{i}.values'], arrays[f'observers.{i}.times']
+            if len(times) > len(observer.times):
+                observer.values, observer.times = values, times
+            else:
+                observer.values[:len(times)] = values
+                observer.times[:len(times)] = times
+            observer.num_observed = len(times)
+            model.observers.append(observer)
+
+        return model
@@ -0,0 +1,137 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .particle_set import ParticleSet
+
+
+class ConstitutiveModel:
+    name: str
+
+    def __init__(self, name: str):
+        """Constructor. Stress update of the particles of a material.
+
+        Subclasses implement `update` over arrays of particles, with the Young modulus looked up in the material table
+        of the `ParticleSet` and their internal variables stored as its fields, so one call updates all particles
+        of a material.
+
+        :param name: Name of the model.
+        """
+        self.name = name
+
+    def __str__(self):
+        params = ', '.join(f"{k}={v}" for k, v in self.parameters().items())
+        return f"{self.__class__.__name__}({params})"
+
+    def parameters(self) -> dict:
+        """Return the arguments of the constructor, to rebuild the model."""
+        return {}
+
+    def instantaneous_modulus(self, young: float | np.ndarray) -> float | np.ndarray:
+        """Return the modulus of the instantaneous response of the material, which sets its wave speed and its
+        stable time step.
+
+        :param young: Young modulus of the material.
+        """
+        return young
+
+    def update(self, particles: 'ParticleSet', index: slice | np.ndarray | int, dt: float | np.ndarray):
+        """Update the stresses and internal variables of particles from their strain increments.
+
+        :param particles: State of the particles.
+        :param index: Slice, indices or index of the updated particles.
+        :param dt: Time step, or time step of each updated particle.
+        """
+        raise NotImplementedError
+
+
+class Elastic(ConstitutiveModel):
+    def __init__(self):
+        """Constructor. Linear elasticity: the stress increment is the Young modulus times the strain increment."""
+        super().__init__('elastic')
+
+    def update(self, particles: 'ParticleSet', index: slice | np.ndarray | int, dt: float | np.ndarray):
+        p = particles
+        p.stress[index] += p.material_property('young', index) * p.strain_increment[index]
+
+
+class ElastoPlastic(ConstitutiveModel):
+    yield_stress: float
+    hardening: float
+
+    def __init__(self, yield_stress: float, hardening: float = 0):
+        """Constructor. Elastoplasticity with linear isotropic hardening, integrated with an elastic predictor and a
+        return mapping to the yield surface |stress| = yield_stress + hardening * accumulated_plastic_strain.
+
+        :param yield_stress: Initial yield stress.
+        :param hardening: Hardening modulus. Zero for perfect plasticity.
+        """
+        if yield_stress <= 0:
+            raise ValueError(f"yield_stress must be positive, not {yield_stress}.")
+        if hardening < 0:
+            raise ValueError(f"hardening must be non-negative, not {hardening}.")
+
+        super().__init__('elastoplastic')
+        self.yield_stress = yield_stress
+        self.hardening = hardening
+
+    def parameters(self) -> dict:
+        return {'yield_stress': self.yield_stress, 'hardening': self.hardening}
+
+    def update(self, particles: 'ParticleSet', index: slice | np.ndarray | int, dt: float | np.ndarray):
+        p = particles
+        young = p.material_property('young', index)
+        alpha = p.accumulated_plastic_strain[index]
+
+        trial = p.stress[index] + young * p.strain_increment[index]
+        excess = np.maximum(np.abs(trial) - (self.yield_stress + self.hardening * alpha), 0)
+        plastic_increment = excess / (young + self.hardening) * np.sign(trial)
+
+        p.stress[index] = trial - young * plastic_increment
+        p.plastic_strain[index] += plastic_increment
+        p.accumulated_plastic_strain[index] = alpha + np.abs(plastic_increment)
+
+
+class ViscoElastic(ConstitutiveModel):
+    viscous_young: float
+    relaxation_time: float
+
+    def __init__(self, viscous_young: float, relaxation_time: float):
+        """Constructor. Standard linear solid: a spring with the Young modulus of the material in parallel with a
+        Maxwell branch, whose stress is integrated exactly for a constant strain rate over the step.
+
+        :param viscous_young: Young modulus of the spring of the Maxwell branch.
+        :param relaxation_time: Relaxation time of the Maxwell branch, its viscosity over viscous_young.
+        """
+        if viscous_young < 0:
+            raise ValueError(f"viscous_young must be non-negative, not {viscous_young}.")
+        if relaxation_time <= 0:
+            raise ValueError(f"relaxation_time must be positive, not {relaxation_time}.")
+
+        super().__init__('viscoelastic')
+        self.viscous_young = viscous_young
+        self.relaxation_time = relaxation_time
+
+    def parameters(self) -> dict:
+        return {'viscous_young': self.viscous_young, 'relaxation_time': self.relaxation_time}
+
+    def instantaneous_modulus(self, young: float | np.ndarray) -> float | np.ndarray:
+        return young + self.viscous_young
+
+    def update(self, particles: 'ParticleSet', index: slice | np.ndarray | int, dt: float | np.ndarray):
+        p = particles
+        q = p.viscous_stress[index]
+        strain_increment = p.strain_increment[index]
+
+        x = np.asarray(dt / self.relaxation_time, dtype=float)
+        decay = np.exp(-x)
+        # Factor of the strain increment, tau / dt * (1 - decay), which tends to 1 for a vanishing time step.
+        rate_factor = np.divide(-np.expm1(-x), x, out=np.ones_like(x), where=x > 0)
+        new_q = decay * q + self.viscous_young * rate_factor * strain_increment
+
+        p.stress[index] += p.material_property('young', index) * strain_increment + new_q - q
+        p.viscous_stress[index] = new_q
+
+
+MODELS = {'elastic': Elastic, 'elastoplastic': ElastoPlastic, 'viscoelastic': ViscoElastic}
@@ -0,0 +1,427 @@
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from .boundary_conditions import BoundaryConditions
+from .engine import Engine
+from .grid import Grid
+from .interpolation import Interpolation
+from .model import Model
+from .particle_set import ParticleSet
+from .progress import Progress
+from .recorder import Recorder
+
+# Columns of the particle handover buffers: the particle fields, the material and the index of the particle in the
+# model.
+HANDOVER_FIELDS = ParticleSet.FIELDS + ('material_id', 'id')
+
+
+class SharedArrays:
+    names: dict[str, str]
+    shapes: dict[str, tuple[int, ...]]
+    dtypes: dict[str, np.dtype]
+    blocks: dict[str, SharedMemory]
+
+    def __init__(self, specs: dict[str, tuple[tuple[int, ...], np.dtype]]):
+        """Constructor. Arrays in shared memory blocks, created by the parent process and attached by the workers.
+
+        :param specs: Shape and data type of each array.
+        """
+        self.shapes = {k: shape for k, (shape, _) in specs.items()}
+        self.dtypes = {k: np.dtype(dtype) for k, (_, dtype) in specs.items()}
+        self.blocks = {k: SharedMemory(create=True, size=max(int(np.prod(shape)) * self.dtypes[k].itemsize, 1))
+                       for k, shape in self.shapes.items()}
+        self.names = {k: b.name for k, b in self.blocks.items()}
+
+    def __getstate__(self):
+        # Workers attach the blocks by name.
+        return {'names': self.names, 'shapes': self.shapes, 'dtypes': self.dtypes}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.blocks = {k: SharedMemory(name=name) for k, name in self.names.items()}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return np.ndarray(self.shapes[name], dtype=self.dtypes[name], buffer=self.blocks[name].buf)
+
+    def close(self):
+        """Detach the blocks from this process."""
+        for b in self.blocks.values():
+            b.close()
+
+    def unlink(self):
+        """Free the blocks. Called once by the parent process."""
+        for b in self.blocks.values():
+            b.close()
+            b.unlink()
+
+
+class HaloEngine(Engine):
+    domain: int
+    num_domains: int
+    shared: SharedArrays
+    barrier: mp.Barrier
+    num_exchanges: int
+
+    def __init__(self, particles: ParticleSet, grid: Grid, interpolation: Interpolation, scheme: str, domain: int,
+                 num_domains: int, shared: SharedArrays, barrier: mp.Barrier):
+        """Constructor. Engine of a subdomain that adds the contributions of the neighbours to its end nodes.
+
+        :param particles: Particles of the subdomain.
+        :param grid: Nodes of the subdomain. The end nodes are shared with the neighbours.
+        :param interpolation: Interpolation cache over the nodes of the subdomain.
+        :param scheme: Update scheme.
+        :param domain: Index of the subdomain.
+        :param num_domains: Number of subdomains.
+        :param shared: Shared arrays of the decomposition.
+        :param barrier: Barrier of all workers.
+        """
+        super().__init__(particles, grid, interpolation=interpolation, scheme=scheme)
+
+        self.domain = domain
+        self.num_domains = num_domains
+        self.shared = shared
+        self.barrier = barrier
+        self.num_exchanges = 0
+
+    def exchange(self, *arrays: np.ndarray):
+        """Add the contributions of the neighbours to the end nodes of nodal arrays.
+
+        The halo buffers alternate between two slots, so a worker never overwrites a slot that its neighbours may
+        still be reading and one barrier per exchange is enough.
+
+        :param arrays: Nodal arrays just mapped from the particles of the subdomain.
+        """
+        halo = self.shared['halo'][self.num_exchanges % 2]
+        self.num_exchanges += 1
+
+        for q, a in enumerate(arrays):
+            halo[self.domain, 0, q] = a[0]
+            halo[self.domain, 1, q] = a[-1]
+
+        self.barrier.wait()
+
+        for q, a in enumerate(arrays):
+            if self.domain > 0:
+                a[0] += halo[self.domain - 1, 1, q]
+            if self.domain < self.num_domains - 1:
+                a[-1] += halo[self.domain + 1, 0, q]
+
+    def map_mass_and_momentum(self):
+        super().map_mass_and_momentum()
+        self.exchange(self.grid.mass, self.grid.momentum)
+
+    def map_momentum(self):
+        super().map_momentum()
+        self.exchange(self.grid.momentum)
+
+    def map_force(self):
+        super().map_force()
+        self.exchange(self.grid.force)
+
+
+def hand_over(domain: int, num_domains: int, particles: ParticleSet, ids: np.ndarray, x_ini: float, x_final: float,
+              shared: SharedArrays, barrier: mp.Barrier, parity: int) -> tuple[ParticleSet, np.ndarray]:
+    """Send the particles that left a subdomain to its neighbours and receive theirs.
+
+    A position equal to the node shared with the right neighbour belongs to the right neighbour, as the elements
+    are closed on the left. The buffers alternate between two slots like the halo buffers.
+
+    :param domain: Index of the subdomain.
+    :param num_domains: Number of subdomains.
+    :param particles: Particles of the subdomain after a step.
+    :param ids: Index of each particle in the model.
+    :param x_ini: Position of the first node of the subdomain.
+    :param x_final: Position of the last node of the subdomain.
+    :param shared: Shared arrays of the decomposition.
+    :param barrier: Barrier of all workers.
+    :param parity: Slot of the buffers.
+    :return: Particles of the subdomain and their indices in the model.
+    """
+    outbox = shared['outbox'][parity]
+    counts = shared['counts'][parity]
+    capacity = outbox.shape[2]
+
+    def columns(mask: np.ndarray) -> np.ndarray:
+        return np.column_stack([getattr(particles, f)[mask] for f in ParticleSet.FIELDS]
+                               + [particles.material_id[mask], ids[mask]])
+
+    no_one = np.zeros(len(particles), dtype=bool)
+    leaving = [particles.x < x_ini if domain > 0 else no_one,
+               particles.x >= x_final if domain < num_domains - 1 else no_one]
+    for side, mask in enumerate(leaving):
+        n = np.count_nonzero(mask)
+        if n > capacity:
+            raise RuntimeError(f"{n} particles cross a subdomain boundary in one step. Increase handover_capacity.")
+        counts[domain, side] = n
+        if n:
+            outbox[domain, side, :n] = columns(mask)
+
+    barrier.wait()
+
+    incoming = []
+    if domain > 0:
+        incoming.append(outbox[domain - 1, 1, :counts[domain - 1, 1]])
+    if domain < num_domains - 1:
+        incoming.append(outbox[domain + 1, 0, :counts[domain + 1, 0]])
+
+    keep = ~(leaving[0] | leaving[1])
+    if keep.all() and not any(len(rows) for rows in incoming):
+        return particles, ids
+
+    rows = np.concatenate([columns(keep)] + incoming)
+    new = ParticleSet(len(rows))
+    for c, f in enumerate(ParticleSet.FIELDS):
+        getattr(new, f)[:] = rows[:, c]
+    new.materials = particles.materials
+    new.material_id[:] = rows[:, -2]
+
+    return new, rows[:, -1].astype(int)
+
+
+class Subdomain:
+    domain: int
+    num_domains: int
+    node_range: tuple[int, int]
+    x: np.ndarray
+    is_fixed: np.ndarray
+    conditions: BoundaryConditions
+    particles: ParticleSet
+    ids: np.ndarray
+    out_of_domain: str
+    scheme: str
+    dt: float
+    num_steps: int
+    total_time: float
+    fields: tuple[str, ...]
+    stride: int
+
+    def __init__(self, model: Model, domain: int, num_domains: int, node_range: tuple[int, int], ids: np.ndarray):
+        """Constructor. What a worker process needs to advance one subdomain, taken from the model so the workers
+        do not receive the model itself, with its engine and its records.
+
+        :param model: Model with the initial state.
+        :param domain: Index of the subdomain.
+        :param num_domains: Number of subdomains.
+        :param node_range: First and last node of the subdomain.
+        :param ids: IDs of the particles of the model that start in the subdomain.
+        """
+        first, last = node_range
+        grid = model.mesh.grid
+
+        self.domain = domain
+        self.num_domains = num_domains
+        self.node_range = node_range
+        self.x = grid.x[first:last + 1].copy()
+        self.is_fixed = grid.is_fixed[first:last + 1].copy()
+        self.conditions = grid.conditions
+        self.particles = model.particle_set.take(ids)
+        self.ids = ids
+        self.out_of_domain = model.out_of_domain
+        self.scheme = model.scheme
+        self.dt = model.initial_dt
+        self.num_steps = model.number_of_steps()
+        self.total_time = model.total_time
+        self.fields = model.result.fields
+        self.stride = model.result.stride
+
+
+def solve_subdomain(sub: Subdomain, shared: SharedArrays, barrier: mp.Barrier, errors: mp.Queue,
+                    progress: Progress | None):
+    """Advance the particles of one subdomain for all time steps. Target of the worker processes.
+
+    :param sub: Initial state and settings of the subdomain.
+    :param shared: Shared arrays of the decomposition.
+    :param barrier: Barrier of all workers.
+    :param errors: Queue where a failing worker puts its exception.
+    :param progress: Reporter of the progress, given to one worker only.
+    """
+    try:
+        domain, num_domains = sub.domain, sub.num_domains
+        first, last = sub.node_range
+        grid = Grid(sub.x)
+        grid.is_fixed[:] = sub.is_fixed
+        grid.conditions = sub.conditions.subset(first, last)
+
+        particles, ids = sub.particles, sub.ids
+        engine = HaloEngine(particles, grid, Interpolation(grid, out_of_domain=sub.out_of_domain), sub.scheme,
+                            domain, num_domains, shared, barrier)
+
+        records = {f: shared[f'record.{f}'] for f in sub.fields}
+        series = shared['series']
+        stride = sub.stride
+        dt = sub.dt
+
+        if progress is not None:
+            progress.start(sub.total_time)
+
+        for i in range(sub.num_steps):
+            if i > 0:
+                particles, ids = hand_over(domain, num_domains, particles, ids, grid.x[0], grid.x[-1], shared,
+                                           barrier, i % 2)
+                engine.particles = particles
+
+            engine.step(dt, time=i * dt)
+
+            if i % stride == 0:
+                for f, a in records.items():
+                    a[i // stride, ids] = getattr(particles, f)
+                if domain == 0:
+                    series[i // stride] = (i, i * dt, dt)
+
+            if progress is not None:
+                progress.update(i + 1, (i + 1) * dt)
+
+        final = shared['final']
+        for c, f in enumerate(ParticleSet.FIELDS):
+            final[ids, c] = getattr(particles, f)
+        grid_state = shared['grid']
+        for c, f in enumerate(('mass', 'momentum', 'force')):
+            grid_state[first:last + 1, c] = getattr(grid, f)
+
+        if progress is not None:
+            progress.finish()
+    except BrokenBarrierError:
+        # Another worker failed and reported its exception.
+        pass
+    except Exception as e:
+        barrier.abort()
+        errors.put(e)
+    finally:
+        shared.close()
+
+
+class DomainDecomposition:
+    model: Model
+    num_domains: int
+    handover_capacity: int
+    node_ranges: list[tuple[int, int]]
+
+    def __init__(self, model: Model, num_domains: int, handover_capacity: int | None = None):
+        """Constructor. Solve a model splitting its mesh in contiguous subdomains, each one advanced by a process.
+
+        Neighbouring subdomains share a node. In each mapping, the workers add the contributions of their
+        neighbours to the shared nodes through shared memory, and after each step the particles that crossed a
+        subdomain boundary are handed over to the neighbour. The results match the single process solution up to
+        the rounding of the sums in the shared nodes. The model needs a fixed time step and linear shape functions.
+
+        The workers advance their particles with the vectorized engine, whatever the `engine` and `num_threads` of
+        the model. They receive only their nodes, conditions and particles, so with the 'spawn' and 'forkserver'
+        start methods of multiprocessing, time-dependent conditions must be functions that can be pickled, e.g.
+        defined at module level.
+
+        :param model: Model with the initial conditions. Its particles, time and `result` are updated by `solve`.
+        :param num_domains: Number of subdomains and worker processes.
+        :param handover_capacity: Maximum number of particles that cross a subdomain boundary in one step. By
+            default, the number of particles of 4 elements.
+        """
+        if num_domains < 1:
+            raise ValueError(f"num_domains must be a positive integer, not {num_domains}.")
+        if num_domains > len(model.mesh.elements):
+            raise ValueError(f"A mesh of {len(model.mesh.elements)} elements cannot be split in {num_domains} "
+                             f"subdomains.")
+        if model.adaptive_dt is not None:
+            raise ValueError("A domain decomposition needs a model with a fixed time step.")
+        if model.basis != 'linear':
+            raise ValueError("A domain decomposition needs a model with the 'linear' basis.")
+
+        self.model = model
+        self.num_domains = num_domains
+        self.handover_capacity = 4 * model.num_particles_per_el if handover_capacity is None else handover_capacity
+
+        # Subdomains with the same number of elements, give or take one.
+        bounds = np.linspace(0, len(model.mesh.elements), num_domains + 1).round().astype(int)
+        self.node_ranges = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def __len__(self):
+        return self.num_domains
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(n_domains={self.num_domains}, n_particles={len(self.model.particle_set)})"
+
+    def owners(self) -> np.ndarray:
+        """Return the subdomain that owns each particle of the model, by ID, from the element that contains it."""
+        ps = self.model.particle_set
+        interpolation = Interpolation(self.model.mesh.grid, out_of_domain=self.model.out_of_domain)
+        interpolation.locate(ps.in_id_order(ps.x))
+        starts = np.array([a for a, _ in self.node_ranges])
+        return np.searchsorted(starts, interpolation.cells, side='right') - 1
+
+    def solve(self, recorder: Recorder | None = None, progress: Progress | None = None):
+        """Solve the model for each time step with one process per subdomain.
+
+        :param recorder: Recorder of the particle fields. By default, positions and velocities are saved in every
+            step.
+        :param progress: Reporter of the progress. By default, a `Progress` that logs at most once per second.
+        """
+        m = self.model
+        ps = m.particle_set
+        n = len(ps)
+        num_steps = m.number_of_steps()
+
+        m.result = Recorder() if recorder is None else recorder
+        m.result.allocate(num_steps, ps, m.initial_dt, m.metadata())
+        n_records = m.result.num_records(num_steps)
+
+        n_cols = len(HANDOVER_FIELDS)
+        specs = {'final': ((n, len(ParticleSet.FIELDS)), np.float64),
+                 'grid': ((len(m.mesh.grid), 3), np.float64),
+                 'halo': ((2, self.num_domains, 2, 2), np.float64),
+                 'outbox': ((2, self.num_domains, 2, self.handover_capacity, n_cols), np.float64),
+                 'counts': ((2, self.num_domains, 2), np.int64),
+                 'series': ((n_records, 3), np.float64)}
+        specs.update({f'record.{f}': ((n_records, n), m.result.dtype) for f in m.result.fields})
+
+        shared = SharedArrays(specs)
+        try:
+            owners = self.owners()
+            barrier = mp.Barrier(self.num_domains)
+            errors = mp.Queue()
+            progress = Progress() if progress is None else progress
+            workers = [mp.Process(target=solve_subdomain,
+                                  args=(Subdomain(m, k, self.num_domains, self.node_ranges[k],
+                                                  np.flatnonzero(owners == k)),
+                                        shared, barrier, errors, progress if k == 0 else None))
+                       for k in range(self.num_domains)]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+
+            if not errors.empty():
+                raise errors.get()
+            if any(w.exitcode for w in workers):
+                raise RuntimeError(f"Worker processes exited with codes {[w.exitcode for w in workers]}.")
+
+            self.gather(shared, n_records)
+        finally:
+            shared.unlink()
+
+    def gather(self, shared: SharedArrays, n_records: int):
+        """Copy the final state and the records of the workers to the model.
+
+        :param shared: Shared arrays of the decomposition.
+        :param n_records: Number of records of the solution.
+        """
+        m = self.model
+        final = shared['final']
+        for c, f in enumerate(ParticleSet.FIELDS):
+            m.particle_set.set_field(f, final[:, c])
+
+        grid_state = shared['grid']
+        for c, f in enumerate(('mass', 'momentum', 'force')):
+            getattr(m.mesh.grid, f)[:] = grid_state[:, c]
+
+        for f in m.result.fields:
+            m.result.data[f][:n_records] = shared[f'record.{f}']
+        series = shared['series']
+        m.result.series['step'][:n_records] = series[:, 0]
+        m.result.series['time'][:n_records] = series[:, 1]
+        m.result.series['step_dt'][:n_records] = series[:, 2]
+        m.result.num_recorded = n_records
+        m.result.close()
+
+        m.step_index = m.number_of_steps()
+        m.time = m.step_index * m.initial_dt
@@ -0,0 +1,113 @@
+import json
+import os
+
+import numpy as np
+
+from .recorder import Recorder
+
+
+class DiskRecorder(Recorder):
+    HEADER = 'header.json'
+
+    path: str
+    flush_every: int
+
+    def __init__(self, path: str, fields: tuple[str, ...] = ('x', 'velocity'), stride: int = 1, dtype=np.float64,
+                 flush_every: int = 1000):
+        """Constructor. Stream the records to .npy files in a directory through memory maps.
+
+        Each field is stored in `<path>/<field>.npy` with shape (n_records, n_particles), each series in
+        `<path>/<series>.npy`, the initial particle masses in `<path>/initial_mass.npy` and the time step, model
+        description and number of saved records in `<path>/header.json`.
+
+        :param path: Directory of the store. It is created if it does not exist.
+        :param fields: Names of the `ParticleSet` fields to record.
+        :param stride: Record one of every `stride` time steps.
+        :param dtype: Data type of the recorded arrays.
+        :param flush_every: Number of records written between flushes of the files to disk.
+        """
+        super().__init__(fields, stride, dtype)
+
+        self.path = path
+        self.flush_every = flush_every
+
+    def __str__(self):
+        return f"{super().__str__()[:-1]}, path='{self.path}')"
+
+    @classmethod
+    def open(cls, path: str, mode: str = 'r') -> 'DiskRecorder':
+        """Open a store. The records are memory mapped and only read from disk on access.
+
+        :param path: Directory of the store.
+        :param mode: 'r' to read the records or 'r+' to continue recording, e.g. after a restart.
+        """
+        with open(os.path.join(path, cls.HEADER)) as f:
+            header = json.load(f)
+
+        recorder = cls(path, tuple(header['fields']), header['stride'], header['dtype'])
+        recorder.data = {f: np.load(recorder.field_path(f), mmap_mode=mode) for f in recorder.fields}
+        recorder.series = {s: np.load(recorder.field_path(s), mmap_mode=mode) for s in cls.SERIES}
+        recorder.num_recorded = header['num_recorded']
+        recorder.dt = header['dt']
+        recorder.initial_mass = np.load(recorder.field_path('initial_mass'))
+        recorder.metadata = header['metadata']
+
+        return recorder
+
+    def field_path(self, name: str) -> str:
+        """Return the path of the file that stores a field or a series."""
+        return os.path.join(self.path, f'{name}.npy')
+
+    def allocate(self, num_steps: int, particles, dt: float, metadata: dict | None = None):
+        os.makedirs(self.path, exist_ok=True)
+        super().allocate(num_steps, particles, dt, metadata)
+
+        np.save(self.field_path('initial_mass'), self.initial_mass)
+        self.write_header()
+
+    def empty_field(self, name: str, shape: tuple[int, ...], dtype) -> np.ndarray:
+        return np.lib.format.open_memmap(self.field_path(name), mode='w+', dtype=dtype, shape=shape)
+
+    def grow(self):
+        # The larger file is written next to the current one and then replaces it.
+        n = self.capacity()
+        for arrays in (self.data, self.series):
+            for name, a in arrays.items():
+                tmp = self.field_path(f'{name}.tmp')
+                shape = (max(2 * n, 1),) + a.shape[1:]
+                new = np.lib.format.open_memmap(tmp, mode='w+', dtype=a.dtype, shape=shape)
+                new[:n] = a
+                os.replace(tmp, self.field_path(name))
+                arrays[name] = new
+
+        self.write_header()
+
+    def record(self, step: int, particles, time: float | None = None, dt: float | None = None):
+        n = self.num_recorded
+        super().record(step, particles, time, dt)
+
+        if self.num_recorded > n and self.num_recorded % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        """Write the pending records to disk and update the header."""
+        for arrays in (self.data, self.series):
+            for a in arrays.values():
+                a.flush()
+        self.write_header()
+
+    def close(self):
+        self.flush()
+
+    def write_header(self):
+        """Write the description of the store to the header file."""
+        header = {'fields': self.fields,
+                  'stride': self.stride,
+                  'dtype': self.dtype.str,
+                  'num_records': self.capacity(),
+                  'num_recorded': self.num_recorded,
+                  'dt': self.dt,
+                  'metadata': self.metadata}
+
+        with open(os.path.join(self.path, self.HEADER), 'w') as f:
+            json.dump(header, f, indent=2)
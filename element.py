@@ -1,25 +1,27 @@
-from node import Node
-from material import Material
+from .node import Node
+from .material import Material
 
 
 class Element:
     nodes: list[Node]
-    length: float
     mass: float
     volume: float
     material: Material
 
-    def __init__(self, nodes: list[Node], volume: float = 1, material: Material = None):
+    def __init__(self, nodes: list[Node], volume: float | None = None, material: Material = None):
         """Constructor.
 
         :param nodes: List of nodes.
-        :param volume: Initial volume.
+        :param volume: Initial volume. By default, the length of the element times a unit cross-section, so elements
+            of different lengths in a non-uniform mesh are parts of the same bar.
         :param material: Material object.
         """
         self.nodes = nodes
-        self.volume = volume
         self.material = material
 
+        self._length = self.x_final() - self.x_ini()
+        self.volume = self._length if volume is None else volume
+
         self.mass = self.material.rho * self.volume
 
     def x_ini(self) -> float:
@@ -31,7 +33,8 @@ class Element:
         return self.nodes[1].x
 
     def length(self) -> float:
-        return self.x_final() - self.x_ini()
+        """Return the length of the element, computed once from the node positions."""
+        return self._length
 
     def reset(self):
         """Reset the values of element nodes."""
@@ -0,0 +1,306 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TYPE_CHECKING
+
+import numpy as np
+
+from .constitutive_model import Elastic
+from .grid import Grid
+from .interpolation import Interpolation
+from .particle_set import ParticleSet
+from .profiler import Profiler
+from .update_scheme import SCHEMES, UpdateScheme
+
+if TYPE_CHECKING:
+    from scipy.sparse import csc_matrix
+
+
+class Engine:
+    MAPPINGS = ('scatter', 'sparse', 'threaded')
+
+    particles: ParticleSet
+    grid: Grid
+    interpolation: Interpolation
+    mapping: str
+    scheme: UpdateScheme
+    profiler: Profiler | None
+    time: float | np.ndarray
+    chunk_size: int
+    executor: ThreadPoolExecutor | None
+    shape_operator: 'csc_matrix | None'
+    diff_shape_operator: 'csc_matrix | None'
+
+    def __init__(self, particles: ParticleSet, grid: Grid, mapping: str = 'scatter',
+                 interpolation: Interpolation | None = None, scheme: str | UpdateScheme = 'usl',
+                 num_threads: int | None = None, chunk_size: int = 65536):
+        """Constructor. Vectorized solver acting on the struct-of-arrays state of a model.
+
+        :param particles: State of the particles.
+        :param grid: State of the mesh nodes.
+        :param mapping: 'scatter' to map with bincount and gathers, 'sparse' to assemble the interpolation
+            matrices of each step and map with sparse matrix-vector products or 'threaded' to map chunks of
+            particles in a thread pool. The results of 'threaded' do not depend on the number of threads.
+        :param interpolation: Interpolation cache over the grid. By default, the grid is a single mesh.
+        :param scheme: Update scheme, 'usl', 'usf', 'musl' or an `UpdateScheme` object.
+        :param num_threads: Number of threads of the 'threaded' mapping. By default, the number of CPUs.
+        :param chunk_size: Number of particles of each task of the 'threaded' mapping.
+        """
+        if mapping not in self.MAPPINGS:
+            raise ValueError(f"mapping must be one of {self.MAPPINGS}, not '{mapping}'.")
+        if isinstance(scheme, str) and scheme not in SCHEMES:
+            raise ValueError(f"scheme must be one of {tuple(SCHEMES)}, not '{scheme}'.")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, not {chunk_size}.")
+
+        self.particles = particles
+        self.grid = grid
+        self.interpolation = Interpolation(grid) if interpolation is None else interpolation
+        self.mapping = mapping
+        self.scheme = SCHEMES[scheme]() if isinstance(scheme, str) else scheme
+        self.profiler = None
+        self.time = 0
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(num_threads) if mapping == 'threaded' else None
+
+        self.shape_operator = None
+        self.diff_shape_operator = None
+
+    def lap(self, name: str):
+        """Charge the time since the previous mark to a phase of the profiler, if any.
+
+        :param name: Name of the phase that ended.
+        """
+        if self.profiler:
+            self.profiler.lap(name)
+
+    def chunks(self) -> list[slice]:
+        """Return the slices of particles mapped by each task of the 'threaded' mapping."""
+        n = len(self.particles)
+        return [slice(i, min(i + self.chunk_size, n)) for i in range(0, n, self.chunk_size)]
+
+    def scatter(self, *weights: Callable[[slice], np.ndarray]) -> list[np.ndarray]:
+        """Return the nodal sums of the contributions of the particles to their support nodes.
+
+        With the 'threaded' mapping, each chunk of particles is summed in a private buffer over the range of nodes
+        it touches, and the buffers are added to the result in chunk order, so the result does not depend on the
+        number of threads.
+
+        :param weights: Functions that return the contributions (n_particles x n_support) of a slice of particles.
+        """
+        n = len(self.grid)
+        nodes = self.interpolation.nodes
+
+        if self.mapping != 'threaded':
+            idx = nodes.ravel()
+            return [np.bincount(idx, w(slice(None)).ravel(), minlength=n) for w in weights]
+
+        def scatter_chunk(s: slice) -> tuple[int, list[np.ndarray]]:
+            lo = nodes[s].min()
+            idx = (nodes[s] - lo).ravel()
+            size = nodes[s].max() - lo + 1
+            return lo, [np.bincount(idx, w(s).ravel(), minlength=size) for w in weights]
+
+        totals = [np.zeros(n) for _ in weights]
+        for lo, buffers in self.executor.map(scatter_chunk, self.chunks()):
+            for total, buffer in zip(totals, buffers):
+                total[lo:lo + len(buffer)] += buffer
+
+        return totals
+
+    def gather(self, update: Callable[[slice], None]):
+        """Update the particles, in parallel chunks with the 'threaded' mapping.
+
+        :param update: Function that updates a slice of particles.
+        """
+        if self.mapping == 'threaded':
+            list(self.executor.map(update, self.chunks()))
+        else:
+            update(slice(None))
+
+    def map_mass_and_momentum(self):
+        """Scatter mass and momentum of the particles to the nodes."""
+        p = self.particles
+
+        if self.mapping == 'sparse':
+            self.grid.mass[:] = self.shape_operator @ p.mass
+            self.grid.momentum[:] = self.shape_operator @ p.momentum()
+            return
+
+        shape = self.interpolation.shape
+        momentum = p.momentum()
+        self.grid.mass[:], self.grid.momentum[:] = self.scatter(lambda s: shape[s] * p.mass[s, None],
+                                                                lambda s: shape[s] * momentum[s, None])
+
+    def map_momentum(self):
+        """Scatter again the momentum of the particles to the nodes, keeping the nodal mass."""
+        p = self.particles
+
+        if self.mapping == 'sparse':
+            self.grid.momentum[:] = self.shape_operator @ p.momentum()
+            return
+
+        shape = self.interpolation.shape
+        momentum = p.momentum()
+        self.grid.momentum[:], = self.scatter(lambda s: shape[s] * momentum[s, None])
+
+    def map_force(self):
+        """Scatter the internal force of the particles to the nodes."""
+        p = self.particles
+
+        if self.mapping == 'sparse':
+            self.grid.force[:] = self.diff_shape_operator @ (-p.stress * p.current_volume)
+            return
+
+        diff_shape = self.interpolation.diff_shape
+        self.grid.force[:], = self.scatter(lambda s: (-p.stress[s] * p.current_volume[s])[:, None] * diff_shape[s])
+
+    def map_particles_to_nodes(self):
+        """Scatter mass, momentum and internal force of the particles to the nodes."""
+        self.map_mass_and_momentum()
+        self.map_force()
+        self.grid.apply_constraints(self.time)
+
+    def apply_constraints(self, node_dt: float | np.ndarray):
+        """Apply the boundary conditions of the grid to the momentum and force mapped at the beginning of the step.
+
+        :param node_dt: Time step, or time step of each node.
+        """
+        self.grid.apply_constraints(self.time, node_dt)
+
+    def apply_momentum_constraints(self, node_dt: float | np.ndarray = 0):
+        """Apply the boundary conditions of the grid to the mapped momentum.
+
+        :param node_dt: Time since the beginning of the step of the mapped momentum, or that time for each node.
+        """
+        self.grid.apply_momentum_constraints(self.time + node_dt)
+
+    def apply_force_constraints(self, node_dt: float | np.ndarray):
+        """Apply the boundary conditions of the grid to the mapped force.
+
+        :param node_dt: Time step, or time step of each node.
+        """
+        self.grid.apply_force_constraints(self.time, node_dt)
+
+    def update_particles_from_nodes(self, dt: float | np.ndarray):
+        """Gather the nodal force and momentum to update particle velocities and positions.
+
+        :param dt: Time step, or time step of each particle.
+        """
+        p = self.particles
+        g = self.grid
+
+        if self.mapping == 'sparse':
+            inv_mass = np.zeros(len(g))
+            np.divide(1, g.mass, out=inv_mass, where=g.mass > 0)
+            p.velocity += dt * (self.shape_operator.T @ (g.force * inv_mass))
+            p.x += dt * (self.shape_operator.T @ (g.momentum * inv_mass))
+            return
+
+        nodes = self.interpolation.nodes
+        shape = self.interpolation.shape
+
+        def update(s: slice):
+            nodes_s = nodes[s]
+            shape_s = shape[s]
+            dt_s = dt[s] if np.ndim(dt) else dt
+
+            # Contributions are added one support node at a time to keep the summation order of the object path.
+            for j in range(nodes.shape[1]):
+                m = g.mass[nodes_s[:, j]]
+                has_mass = m > 0
+                p.velocity[s] += np.divide(dt_s * shape_s[:, j] * g.force[nodes_s[:, j]], m, out=np.zeros(len(m)),
+                                           where=has_mass)
+                p.x[s] += np.divide(dt_s * shape_s[:, j] * g.momentum[nodes_s[:, j]], m, out=np.zeros(len(m)),
+                                    where=has_mass)
+
+        self.gather(update)
+
+    def update_stress(self, dt: float | np.ndarray):
+        """Update the velocity gradient from the nodal velocities and then the strains and stresses.
+
+        :param dt: Time step, or time step of each particle.
+        """
+        p = self.particles
+        v = self.grid.velocity()
+
+        if self.mapping == 'sparse':
+            p.velocity_gradient += self.diff_shape_operator.T @ v
+            self.update_particle_strains(dt)
+            return
+
+        nodes = self.interpolation.nodes
+        diff_shape = self.interpolation.diff_shape
+
+        def update(s: slice):
+            for j in range(nodes.shape[1]):
+                p.velocity_gradient[s] += diff_shape[s, j] * v[nodes[s, j]]
+
+            self.update_particle_strains(dt, s)
+
+        self.gather(update)
+
+    def update_particle_strains(self, dt: float | np.ndarray, particles: slice = slice(None)):
+        """Update deformation gradient, volume, strain increment and stress from the velocity gradient.
+
+        :param dt: Time step, or time step of each particle.
+        :param particles: Slice of the particles to update. By default, all of them.
+        """
+        p = self.particles
+        s = particles
+        dt = dt[s] if np.ndim(dt) else dt
+
+        p.deformation_gradient[s] *= 1 + p.velocity_gradient[s] * dt
+        p.current_volume[s] = p.deformation_gradient[s] * p.initial_volume[s]
+        p.strain_increment[s] = p.velocity_gradient[s] * dt
+        self.update_particle_stresses(dt, s)
+
+    def update_particle_stresses(self, dt: float | np.ndarray, particles: slice = slice(None)):
+        """Update the stresses from the strain increments with one call to the constitutive model of each material.
+
+        :param dt: Time step, or time step of each particle of the slice.
+        :param particles: Slice of the particles to update. By default, all of them.
+        """
+        p = self.particles
+        s = particles
+        models = [m.model for m in p.materials]
+
+        if all(isinstance(model, Elastic) for model in models):
+            p.stress[s] += p.material_property('young', s) * p.strain_increment[s]
+            return
+
+        ids = p.material_id[s]
+        for i, model in enumerate(models):
+            local = np.flatnonzero(ids == i)
+            if len(local) == len(ids):
+                model.update(p, s, dt)
+            elif len(local):
+                model.update(p, local + (s.start or 0), dt[local] if np.ndim(dt) else dt)
+
+    def step(self, dt: float | np.ndarray, node_dt: float | np.ndarray | None = None, time: float | np.ndarray = 0):
+        """Solve with the update scheme for one time step.
+
+        :param dt: Time step, or time step of each particle.
+        :param node_dt: Time step of each node when `dt` is given per particle. Defaults to `dt`.
+        :param time: Time at the beginning of the step, or time of each node, for the time-dependent boundary
+            conditions.
+        """
+        if node_dt is None:
+            node_dt = dt
+        self.time = time
+
+        if self.profiler:
+            self.profiler.start()
+
+        self.grid.reset()
+        self.particles.reset()
+        self.lap('reset')
+
+        # Shape functions and derivatives in the positions of the beginning of the step.
+        self.interpolation.update(self.particles.x)
+        self.lap('interpolation')
+
+        if self.mapping == 'sparse':
+            self.shape_operator = self.interpolation.shape_operator()
+            self.diff_shape_operator = self.interpolation.diff_shape_operator()
+            self.lap('operators')
+
+        self.scheme.step(self, dt, node_dt)
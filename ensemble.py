@@ -0,0 +1,196 @@
+import numpy as np
+
+from .boundary_conditions import BoundaryConditions
+from .engine import Engine
+from .grid import Grid
+from .interpolation import Interpolation
+from .model import Model
+from .particle_set import ParticleSet
+from .progress import Progress
+from .recorder import Recorder
+
+
+class Ensemble:
+    DT_MODES = ('own', 'common')
+
+    models: list[Model]
+    dt_mode: str
+    particle_set: ParticleSet
+    grid: Grid
+    member: np.ndarray
+    node_member: np.ndarray
+    solver: Engine
+    joined_conditions: list[tuple[BoundaryConditions, int]]
+
+    def __init__(self, models: list[Model], dt_mode: str = 'own'):
+        """Constructor. Advance several models with meshes of the same topology in lockstep.
+
+        The particles and nodes of all members are joined in a single `ParticleSet` and `Grid`, so one vectorized
+        step advances every member. The arrays of each member become views of the joined arrays, hence initial
+        conditions set before the ensemble is created are kept, and the members' `Particle`, `Node` and `result`
+        hold the solution of each member afterwards. Members may have different materials, initial conditions,
+        number of particles per element and total time.
+
+        After the ensemble is created, changes to the particle fields and fixed nodes of the members take effect, as
+        they are views, and so do the conditions prescribed on their grids, which are joined again in the next
+        step. Meshes, materials, particles and time settings of the members are fixed when the ensemble is created.
+
+        :param models: Members of the ensemble.
+        :param dt_mode: 'own' to advance each member with its own dt (members that finish earlier stay frozen) or
+            'common' to advance all members with the smallest dt among them. The last step of a member whose
+            total time is not a multiple of that dt is shortened to end at its total time.
+        """
+        if not models:
+            raise ValueError("An ensemble needs at least one model.")
+        if dt_mode not in self.DT_MODES:
+            raise ValueError(f"dt_mode must be one of {self.DT_MODES}, not '{dt_mode}'.")
+        if len({len(m.mesh.nodes) for m in models}) > 1:
+            raise ValueError("All models of an ensemble must have meshes with the same number of nodes.")
+        if any(m.adaptive_dt is not None for m in models):
+            raise ValueError("Models of an ensemble must have a fixed time step.")
+        if len({m.out_of_domain for m in models}) > 1:
+            raise ValueError("All models of an ensemble must handle particles outside the mesh in the same way.")
+        if len({m.scheme for m in models}) > 1:
+            raise ValueError("All models of an ensemble must use the same update scheme.")
+        if len({m.basis for m in models}) > 1:
+            raise ValueError("All models of an ensemble must use the same shape functions.")
+
+        self.models = models
+        self.dt_mode = dt_mode
+
+        if dt_mode == 'common':
+            dt = min(m.dt for m in models)
+            for m in models:
+                m.initial_dt = m.dt = dt
+
+        self.join()
+
+    def __len__(self):
+        return len(self.models)
+
+    def __str__(self):
+        n_models = f"n_models={len(self)}"
+        n_particles = f"n_particles={len(self.particle_set)}"
+        dt_mode = f"dt_mode='{self.dt_mode}'"
+
+        return f"{self.__class__.__name__}({n_models}, {n_particles}, {dt_mode})"
+
+    def join(self):
+        """Join the particles and nodes of the members and turn the arrays of the members into views of them."""
+        sets = [m.particle_set for m in self.models]
+        grids = [m.mesh.grid for m in self.models]
+
+        self.particle_set = ParticleSet(sum(len(s) for s in sets))
+        self.grid = Grid(np.concatenate([g.x for g in grids]))
+        self.member = np.repeat(np.arange(len(self)), [len(s) for s in sets])
+        self.node_member = np.repeat(np.arange(len(self)), [len(g) for g in grids])
+
+        for f in ParticleSet.FIELDS:
+            setattr(self.particle_set, f, np.concatenate([getattr(s, f) for s in sets]))
+        # Merge the material tables, shifting the material IDs of each member past those of the previous ones.
+        offsets = np.cumsum([0] + [len(s.materials) for s in sets])
+        self.particle_set.materials = [m for s in sets for m in s.materials]
+        self.particle_set.material_id = np.concatenate([np.where(s.material_id < 0, -1, s.material_id + offset)
+                                                        for s, offset in zip(sets, offsets)])
+        for f in ('x', 'is_fixed', 'mass', 'force', 'momentum'):
+            setattr(self.grid, f, np.concatenate([getattr(g, f) for g in grids]))
+
+        p_ini = np.cumsum([0] + [len(s) for s in sets])
+        n_ini = np.cumsum([0] + [len(g) for g in grids])
+        self.join_conditions()
+        for i, (s, g) in enumerate(zip(sets, grids)):
+            for f in ParticleSet.FIELDS + ('material_id',):
+                setattr(s, f, getattr(self.particle_set, f)[p_ini[i]:p_ini[i + 1]])
+            s.materials = self.particle_set.materials
+            for f in ('x', 'is_fixed', 'mass', 'force', 'momentum'):
+                setattr(g, f, getattr(self.grid, f)[n_ini[i]:n_ini[i + 1]])
+
+        segments = [(slice(p_ini[i], p_ini[i + 1]), slice(n_ini[i], n_ini[i + 1])) for i in range(len(self))]
+        particle_length = np.repeat([m.particle_length() for m in self.models], [len(s) for s in sets])
+        self.solver = Engine(self.particle_set, self.grid,
+                             interpolation=Interpolation(self.grid, segments, self.models[0].out_of_domain,
+                                                         basis=self.models[0].basis,
+                                                         particle_length=particle_length),
+                             scheme=self.models[0].scheme)
+
+    def join_conditions(self):
+        """Join the boundary conditions of the members in the conditions of the joined grid."""
+        grids = [m.mesh.grid for m in self.models]
+        offsets = np.cumsum([0] + [len(g) for g in grids])[:-1]
+        self.grid.conditions = BoundaryConditions.join([g.conditions for g in grids], offsets)
+        self.joined_conditions = [(g.conditions, g.conditions.version) for g in grids]
+
+    def dts(self) -> np.ndarray:
+        """Return the time step of each member."""
+        return np.array([m.dt for m in self.models])
+
+    def numbers_of_steps(self) -> np.ndarray:
+        """Return the number of time steps of each member, counting a shortened last step."""
+        total_times = np.array([m.total_time for m in self.models])
+        # The tolerance keeps a rounding residue of an exact multiple of dt from adding a step.
+        return np.ceil(total_times / self.dts() * (1 - 1e-9)).astype(int)
+
+    def step_dts(self, step: int) -> np.ndarray:
+        """Return the time step of each member in a step: its dt, the rest of its total time in its last step and
+        zero after it.
+
+        :param step: Index of the time step.
+        """
+        dts = self.dts()
+        total_times = np.array([m.total_time for m in self.models])
+        return np.where(step < self.numbers_of_steps(), np.minimum(dts, total_times - step * dts), 0)
+
+    def number_of_steps(self) -> int:
+        """Return the number of lockstep iterations needed by the longest member."""
+        return int(self.numbers_of_steps().max())
+
+    def step_solve(self, step: int):
+        """Advance every member that has not reached its number of steps by one time step.
+
+        :param step: Index of the time step.
+        """
+        if any(m.mesh.grid.conditions is not c or c.version != v
+               for m, (c, v) in zip(self.models, self.joined_conditions)):
+            self.join_conditions()
+
+        dts = self.step_dts(step)
+        times = step * self.dts()
+
+        if np.all(dts == dts[0]) and np.all(times == times[0]):
+            self.solver.step(dts[0], time=times[0])
+        else:
+            self.solver.step(dts[self.member], dts[self.node_member], time=times[self.node_member])
+
+    def solve(self, recorders: list[Recorder] | None = None, progress: Progress | None = None):
+        """Solve all members for each time step. The result of each member is stored in its `result`.
+
+        :param recorders: Recorder of each member. By default, positions and velocities are saved in every step.
+        :param progress: Reporter of the progress of the longest member. By default, a `Progress` that logs at most
+            once per second.
+        """
+        if recorders is None:
+            recorders = [Recorder() for _ in self.models]
+
+        num_steps = self.numbers_of_steps()
+        for m, r, n in zip(self.models, recorders, num_steps):
+            m.result = r
+            m.result.allocate(n, m.particle_set, m.dt, m.metadata())
+
+        longest = self.models[int(num_steps.argmax())]
+        progress = Progress() if progress is None else progress
+        progress.start(longest.total_time)
+
+        for i in range(self.number_of_steps()):
+            self.step_solve(i)
+
+            dts = self.step_dts(i)
+            for m, n, dt in zip(self.models, num_steps, dts):
+                if i < n:
+                    m.result.record(i, m.particle_set, i * m.dt, dt)
+
+            progress.update(i + 1, (i + 1) * longest.dt)
+
+        progress.finish()
+
+        for m in self.models:
+            m.result.close()
@@ -1,7 +1,8 @@
-from material import Material
-from plot import Plot
-from model import Model
-from mesh import Mesh
+from .material import Material
+from .plot import Plot
+from .model import Model
+from .mesh import Mesh
+import logging
 from math import pi, sqrt, cos
 
 E = 4 * pi ** 2  # Young modulus.
@@ -36,7 +37,8 @@ mesh.nodes[0].is_fixed = True
 plot = Plot(model)
 # plot.plot_initial_structure()
 
-# Solve model.
+# Solve model, logging its progress.
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 model.solve()
 
 # Analytical solution.
@@ -48,4 +50,4 @@ for i in range(model.number_of_steps()):
 # Plot results.
 plot.plot_velocity_result_in_center_of_mass(va)
 # plot.plot_position_result_in_center_of_mass()
-# plot.animate_solution()
+# plot.animate_solution()  # Or plot.render_animation("solution.gif") without a display.
@@ -1,8 +1,10 @@
-from material import Material
-from plot import Plot
-from model import Model
-from mesh import Mesh
-from math import pi, sin, cos
+from .material import Material
+from .plot import Plot
+from .model import Model
+from .mesh import Mesh
+import logging
+from math import pi, cos
+import numpy as np
 
 E = 100  # Young modulus.
 rho = 1  # Material density.
@@ -13,7 +15,7 @@ n = 1  # Vibration mode.
 
 
 def v_ini(x):
-    return v0 * sin(beta_n * x)
+    return v0 * np.sin(beta_n * x)
 
 
 # Create material
@@ -37,8 +39,7 @@ model = Model(mesh=mesh,
               total_time=140)
 
 # Initial conditions.
-for p in model.particles:
-    p.velocity = v_ini(p.x)
+model.set_initial_conditions(velocity=v_ini)
 
 mesh.nodes[0].is_fixed = True
 
@@ -53,11 +54,12 @@ va = []
 for i in range(model.number_of_steps()):
     va.append(v0 * cos(omega_n * tv[i]) / (beta_n * L))
 
-# Solve model.
+# Solve model, logging its progress.
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 model.solve()
 
 # Plot results.
 # plot.plot_velocity_result_in_center_of_mass(va)
 plot.plot_velocity_error(va)
 # plot.plot_position_result_in_center_of_mass()
-# plot.animate_solution()
+# plot.animate_solution()  # Or plot.render_animation("solution.gif") without a display.
@@ -0,0 +1,79 @@
+import numpy as np
+
+from .boundary_conditions import BoundaryConditions
+
+
+class Grid:
+    x: np.ndarray
+    elements_length: np.ndarray
+    is_fixed: np.ndarray
+    conditions: BoundaryConditions
+    mass: np.ndarray
+    force: np.ndarray
+    momentum: np.ndarray
+
+    def __init__(self, x: np.ndarray):
+        """Constructor. Store the state of all mesh nodes as contiguous arrays.
+
+        :param x: Node positions, in increasing order.
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.elements_length = np.diff(self.x)
+        self.is_fixed = np.zeros(len(self.x), dtype=bool)
+        self.conditions = BoundaryConditions()
+
+        self.mass = np.zeros(len(self.x))
+        self.force = np.zeros(len(self.x))
+        self.momentum = np.zeros(len(self.x))
+
+    def __len__(self):
+        return len(self.x)
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(n_nodes={len(self)}, n_fixed={np.count_nonzero(self.is_fixed)})"
+
+    def velocity(self) -> np.ndarray:
+        """Return the velocity of all nodes. Nodes without mass have zero velocity."""
+        v = np.zeros(len(self))
+        np.divide(self.momentum, self.mass, out=v, where=self.mass > 0)
+        return v
+
+    def apply_constraints(self, time: float | np.ndarray = 0, dt: float | np.ndarray = 0):
+        """Apply the boundary conditions to the mapped momentum and force.
+
+        :param time: Time at the beginning of the step, or time of each node.
+        :param dt: Time step, or time step of each node.
+        """
+        self.apply_momentum_constraints(time)
+        self.apply_force_constraints(time, dt)
+
+    def apply_momentum_constraints(self, time: float | np.ndarray = 0):
+        """Impose the prescribed velocities on the mapped momentum and cancel the momentum of the fixed nodes.
+
+        :param time: Time of the mapped momentum, or time of each node.
+        """
+        self.conditions.apply_to_momentum(self, time)
+        self.momentum[self.is_fixed] = 0
+
+    def apply_force_constraints(self, time: float | np.ndarray = 0, dt: float | np.ndarray = 0):
+        """Add the external forces to the mapped internal force, impose the prescribed velocities at the end of the
+        step and cancel the force of the fixed nodes.
+
+        :param time: Time at the beginning of the step, or time of each node.
+        :param dt: Time step, or time step of each node.
+        """
+        self.conditions.apply_to_force(self, time, dt)
+        self.force[self.is_fixed] = 0
+
+    def update_momentum(self, dt: float | np.ndarray):
+        """Update the nodal momenta with explicit time integration.
+
+        :param dt: Time step, or time step of each node.
+        """
+        self.momentum += self.force * dt
+
+    def reset(self):
+        """Reset values of momentum, mass, and force. Use once in each time step."""
+        self.mass[:] = 0
+        self.force[:] = 0
+        self.momentum[:] = 0
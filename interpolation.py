@@ -0,0 +1,218 @@
+import numpy as np
+
+from .grid import Grid
+
+
+class Interpolation:
+    OUT_OF_DOMAIN = ('raise', 'deactivate')
+    BASES = {'linear': 2, 'gimp': 3, 'bspline2': 3, 'bspline3': 4}
+
+    grid: Grid
+    segments: list[tuple[slice, slice]]
+    out_of_domain: str
+    basis: str
+    particle_length: float | np.ndarray
+    elements: np.ndarray
+    cells: np.ndarray
+    nodes: np.ndarray
+    shape: np.ndarray
+    diff_shape: np.ndarray
+    outside: np.ndarray
+
+    def __init__(self, grid: Grid, segments: list[tuple[slice, slice]] | None = None, out_of_domain: str = 'raise',
+                 basis: str = 'linear', particle_length: float | np.ndarray = 0):
+        """Constructor. Cache of the particle-node interpolation of one time step.
+
+        For each particle, store the element that contains it and, for its support nodes, the node indices, shape
+        functions and their derivatives. Arrays have shape (n_particles, n_support), with 2 support nodes for the
+        linear basis, 3 for GIMP and quadratic B-splines and 4 for cubic B-splines. Near the ends of the mesh, the
+        shape function of the node beyond the end is folded into the two nearest nodes.
+
+        :param grid: Mesh nodes, sorted by position.
+        :param segments: Pairs of particle slice and node slice when the grid joins several meshes. The particles
+            of each slice are located only among the nodes of its mesh. By default, one mesh has all particles.
+        :param out_of_domain: 'raise' to raise a ValueError when a particle leaves the mesh or 'deactivate' to
+            give it null shape functions, so it neither maps to the nodes nor is updated by them.
+        :param basis: Shape functions, 'linear', 'gimp', 'bspline2' (quadratic B-spline) or 'bspline3' (cubic
+            B-spline). All but 'linear' need meshes with elements of equal length.
+        :param particle_length: Length of the particle domain for 'gimp', shared or per particle. It must not
+            exceed the element length.
+        """
+        if out_of_domain not in self.OUT_OF_DOMAIN:
+            raise ValueError(f"out_of_domain must be one of {self.OUT_OF_DOMAIN}, not '{out_of_domain}'.")
+        if basis not in self.BASES:
+            raise ValueError(f"basis must be one of {tuple(self.BASES)}, not '{basis}'.")
+
+        self.grid = grid
+        self.segments = [(slice(None), slice(None))] if segments is None else segments
+        self.out_of_domain = out_of_domain
+        self.basis = basis
+        self.particle_length = particle_length
+
+        if basis != 'linear':
+            for _, ns in self.segments:
+                h = np.diff(self.grid.x[ns])
+                if not np.allclose(h, h[0]):
+                    raise ValueError(f"The '{basis}' basis needs meshes with elements of equal length.")
+                if len(h) < self.BASES[basis] - 1:
+                    raise ValueError(f"The '{basis}' basis needs meshes with at least {self.BASES[basis] - 1} "
+                                     f"elements.")
+        if basis == 'gimp' and not np.all(np.asarray(particle_length) > 0):
+            raise ValueError("The 'gimp' basis needs a positive particle_length.")
+
+        k = self.BASES[basis]
+        self.elements = np.zeros(0, dtype=int)
+        self.cells = np.zeros(0, dtype=int)
+        self.nodes = np.zeros((0, k), dtype=int)
+        self.shape = np.zeros((0, k))
+        self.diff_shape = np.zeros((0, k))
+        self.outside = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def resize(self, num_particles: int):
+        """Allocate the arrays of the cache if the number of particles changed.
+
+        :param num_particles: Number of particles.
+        """
+        if num_particles != len(self):
+            k = self.BASES[self.basis]
+            self.elements = np.zeros(num_particles, dtype=int)
+            self.cells = np.zeros(num_particles, dtype=int)
+            self.nodes = np.zeros((num_particles, k), dtype=int)
+            self.shape = np.zeros((num_particles, k))
+            self.diff_shape = np.zeros((num_particles, k))
+            self.outside = np.zeros(num_particles, dtype=bool)
+
+    def locate(self, x: np.ndarray):
+        """Find the element and the support nodes of each particle.
+
+        Elements are found with a binary search over the node positions. They are closed on the left and open on
+        the right, except the last one, which contains the end of the mesh. Particles outside the mesh are marked in
+        `outside` and take its nearest element.
+
+        :param x: Particle positions.
+        """
+        self.resize(len(x))
+
+        for ps, ns in self.segments:
+            xn = self.grid.x[ns]
+            xp = x[ps]
+            n_els = len(xn) - 1
+
+            self.outside[ps] = (xp < xn[0]) | (xp > xn[-1])
+            self.elements[ps] = np.clip(np.searchsorted(xn, xp, side='right') - 1, 0, n_els - 1)
+            self.cells[ps] = self.elements[ps] + (ns.start or 0)
+
+            if self.basis == 'linear':
+                self.nodes[ps, 0] = self.cells[ps]
+            elif self.basis == 'bspline3':
+                self.nodes[ps, 0] = self.cells[ps] - 1
+            else:
+                # The support of GIMP and quadratic B-splines is centred in the nearest node.
+                h = (xn[-1] - xn[0]) / n_els
+                nearest = np.clip(np.rint((xp - xn[0]) / h).astype(int), 0, n_els)
+                self.nodes[ps, 0] = nearest - 1 + (ns.start or 0)
+
+        self.nodes[:, 1:] = self.nodes[:, :1] + np.arange(1, self.nodes.shape[1])
+
+    def update(self, x: np.ndarray):
+        """Compute the interpolation in the particle positions. Use once in each time step.
+
+        :param x: Particle positions.
+        """
+        self.locate(x)
+
+        if self.basis == 'linear':
+            xn = self.grid.x[self.nodes]
+            lx = self.grid.elements_length[self.nodes[:, 0]]
+
+            np.subtract(x[:, None], xn, out=self.shape)
+            np.abs(self.shape, out=self.shape)
+            self.shape /= lx[:, None]
+            np.subtract(1, self.shape, out=self.shape)
+
+            np.divide(1, lx, out=self.diff_shape[:, 1])
+            np.negative(self.diff_shape[:, 1], out=self.diff_shape[:, 0])
+        else:
+            for ps, ns in self.segments:
+                self.update_segment(x, ps, ns)
+
+        if self.outside.any():
+            if self.out_of_domain == 'raise':
+                raise ValueError(f"Particles {np.flatnonzero(self.outside).tolist()} are outside the mesh.")
+            self.shape[self.outside] = 0
+            self.diff_shape[self.outside] = 0
+
+    def update_segment(self, x: np.ndarray, ps: slice, ns: slice):
+        """Evaluate the GIMP or B-spline shape functions of the particles of one mesh.
+
+        :param x: Particle positions.
+        :param ps: Particles of the mesh.
+        :param ns: Nodes of the mesh.
+        """
+        xn = self.grid.x[ns]
+        first = ns.start or 0
+        n_els = len(xn) - 1
+        h = (xn[-1] - xn[0]) / n_els
+
+        # Distance to the support nodes in element lengths.
+        nodes = self.nodes[ps].copy()
+        r = (x[ps, None] - xn[0]) / h - (nodes - first)
+        a = np.abs(r)
+        sign = np.sign(r)
+
+        if self.basis == 'bspline2':
+            near = a < 0.5
+            shape = np.where(near, 0.75 - r ** 2, 0.5 * np.maximum(1.5 - a, 0) ** 2)
+            diff_shape = np.where(near, -2 * r, -sign * np.maximum(1.5 - a, 0))
+        elif self.basis == 'bspline3':
+            near = a < 1
+            shape = np.where(near, 2 / 3 - r ** 2 + 0.5 * a ** 3, np.maximum(2 - a, 0) ** 3 / 6)
+            diff_shape = np.where(near, -2 * r + 1.5 * r * a, -0.5 * sign * np.maximum(2 - a, 0) ** 2)
+        else:
+            lp = np.asarray(self.particle_length, dtype=float)
+            lp = (lp[ps] if lp.ndim else lp) / (2 * h)
+            lp = lp[:, None] if np.ndim(lp) else lp
+            inner = a < lp
+            middle = (a >= lp) & (a < 1 - lp)
+            tail = np.maximum(1 + lp - a, 0)
+            shape = np.where(inner, 1 - (r ** 2 + lp ** 2) / (2 * lp), np.where(middle, 1 - a, tail ** 2 / (4 * lp)))
+            diff_shape = np.where(inner, -r / lp, np.where(middle, -sign, -sign * tail / (2 * lp)))
+
+        # Fold the ghost node beyond each end of the mesh into the two nearest nodes, extrapolating linearly from
+        # them, which keeps the partition of unity and the reproduction of linear fields.
+        for ghost, end, second, column in ((first - 1, 1, 2, 0), (first + n_els + 1, -2, -3, -1)):
+            is_ghost = nodes[:, column] == ghost
+            if is_ghost.any():
+                for values in (shape, diff_shape):
+                    g = np.where(is_ghost, values[:, column], 0)
+                    values[:, end] += 2 * g
+                    values[:, second] -= g
+                    values[:, column] -= g
+        np.clip(nodes, first, first + n_els, out=nodes)
+        self.nodes[ps] = nodes
+
+        self.shape[ps] = shape
+        self.diff_shape[ps] = diff_shape / h
+
+    def operator(self, values: np.ndarray):
+        """Return a sparse matrix (n_nodes x n_particles) with the values of the support nodes of each particle.
+
+        :param values: Values of the support nodes (n_particles x n_support).
+        """
+        # scipy is only needed by the sparse mapping.
+        from scipy.sparse import csc_matrix
+
+        n, k = self.nodes.shape
+        return csc_matrix((values.ravel(), self.nodes.ravel(), np.arange(0, n * k + 1, k)),
+                          shape=(len(self.grid), n))
+
+    def shape_operator(self):
+        """Return the particle-to-node interpolation matrix N, with N[i, p] the shape function of node i in p."""
+        return self.operator(self.shape)
+
+    def diff_shape_operator(self):
+        """Return the gradient matrix G, with G[i, p] the shape function derivative of node i in p."""
+        return self.operator(self.diff_shape)
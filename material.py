@@ -1,18 +1,28 @@
 from math import sqrt
 
+from .constitutive_model import ConstitutiveModel, Elastic
+
 
 class Material:
-    def __init__(self, density: float, young: float):
+    def __init__(self, density: float, young: float, model: ConstitutiveModel | None = None):
         """Constructor.
 
         :param density: Density.
         :param young: Young modulus.
+        :param model: Constitutive model of the stress update. By default, linear elasticity.
         """
         self.rho = density
         self.young = young
+        self.model = Elastic() if model is None else model
 
     def __str__(self):
-        return f"{self.__class__.__name__}(density={self.rho}, young={self.young})"
+        return f"{self.__class__.__name__}(density={self.rho}, young={self.young}, model={self.model})"
+
+    @property
+    def instantaneous_modulus(self) -> float:
+        """Return the modulus of the instantaneous response, e.g. the Young modulus plus the one of the viscous
+        branch of a viscoelastic material."""
+        return self.model.instantaneous_modulus(self.young)
 
     def elastic_wave_speed(self) -> float:
         """Return the elastic wave speed in material."""
@@ -1,6 +1,9 @@
-from node import Node
-from element import Element
-from material import Material
+import numpy as np
+
+from .node import Node
+from .element import Element
+from .material import Material
+from .grid import Grid
 
 
 class Mesh:
@@ -8,8 +11,12 @@ class Mesh:
     x_final: float
     num_els: int
     length: float
+    coordinates: np.ndarray | None
     nodes: list[Node]
     elements: list[Element]
+    materials: list[Material]
+    material_ids: np.ndarray
+    grid: Grid
 
     def __init__(self, x_ini: float, x_final: float, num_els: int):
         """Constructor.
@@ -21,9 +28,13 @@ class Mesh:
         self.x_ini = x_ini
         self.x_final = x_final
         self.num_els = num_els
+        self.coordinates = None
 
         self.nodes = []
         self.elements = []
+        self.materials = []
+        self.material_ids = np.zeros(0, dtype=int)
+        self.grid = Grid([])
 
     def __str__(self):
         lx = f"length={self.length()}"
@@ -32,36 +43,116 @@ class Mesh:
 
         return f"{self.__class__.__name__}({lx},{n_els}, {n_nodes})"
 
+    @classmethod
+    def from_coordinates(cls, x: list[float] | np.ndarray) -> 'Mesh':
+        """Return a mesh with nodes in arbitrary positions, e.g. refined near a boundary.
+
+        :param x: Node positions, in increasing order.
+        """
+        x = np.asarray(x, dtype=float)
+        if len(x) < 2 or np.any(np.diff(x) <= 0):
+            raise ValueError("Node positions must have at least two values in strictly increasing order.")
+
+        mesh = cls(x_ini=x[0], x_final=x[-1], num_els=len(x) - 1)
+        mesh.coordinates = x
+
+        return mesh
+
     def length(self) -> float:
         """Return the mesh length."""
         return self.x_final - self.x_ini
 
+    def is_uniform(self) -> bool:
+        """Return True if all elements have the same length."""
+        return self.coordinates is None
+
     def elements_length(self) -> float:
-        """Return the length of elements. All elements have same length."""
+        """Return the length of elements if the mesh is uniform or their average length otherwise."""
         return self.length() / self.num_els
 
+    def min_elements_length(self) -> float:
+        """Return the length of the shortest element."""
+        return self.elements_length() if self.is_uniform() else self.grid.elements_length.min()
+
+    def element_index(self, x: float) -> int:
+        """Return the index of the element that contains a position.
+
+        :param x: Position.
+        """
+        i = int(np.searchsorted(self.grid.x, x, side='right')) - 1
+        if x == self.x_final:
+            i = self.num_els - 1
+        if not 0 <= i < self.num_els:
+            raise ValueError(f"Position {x} is outside the mesh [{self.x_ini}, {self.x_final}].")
+
+        return i
+
     def generate_mesh(self, material: Material):
         """Generate elements and nodes of the mesh.
 
         :param material: Material to apply in all elements.
         """
+        if self.coordinates is None:
+            x = np.full(self.num_els + 1, self.elements_length())
+            x[0] = self.x_ini
+            x = np.cumsum(x)
+        else:
+            x = self.coordinates
 
-        x = self.x_ini
-
-        self.nodes.append(Node(x))
+        self.grid = Grid(x)
+        self.nodes = [Node.view(self.grid, i) for i in range(len(self.grid))]
 
         for i in range(self.num_els):
             n1 = self.nodes[i]
-            n2 = Node(x=n1.x + self.elements_length())
-
-            self.nodes.append(n2)
+            n2 = self.nodes[i + 1]
 
             el = Element(nodes=[n1, n2],
                          material=material)
 
             self.elements.append(el)
 
+        self.materials = [material]
+        self.material_ids = np.zeros(self.num_els, dtype=int)
+
+    def set_materials(self, materials: list[Material], material_ids: np.ndarray):
+        """Replace the material table and assign a material to each element by its index in the table.
+
+        :param materials: Material table.
+        :param material_ids: Index of the material of each element.
+        """
+        self.materials = list(materials)
+        self.material_ids = np.array(material_ids, dtype=int)
+        for el, i in zip(self.elements, self.material_ids):
+            el.material = self.materials[i]
+            el.mass = el.material.rho * el.volume
+
+    def assign_material(self, material: Material, x_ini: float = -np.inf, x_final: float = np.inf):
+        """Assign a material to the elements whose center lies in [x_ini, x_final), e.g. a layer of a composite bar.
+        Use after generate_mesh and before generating the particles.
+
+        :param material: Material object.
+        :param x_ini: Initial position of the region.
+        :param x_final: Final position of the region.
+        """
+        centers = 0.5 * (self.grid.x[:-1] + self.grid.x[1:])
+        selected = (centers >= x_ini) & (centers < x_final)
+
+        materials = self.materials
+        if not any(m is material for m in materials):
+            materials = materials + [material]
+        i = next(i for i, m in enumerate(materials) if m is material)
+
+        material_ids = self.material_ids.copy()
+        material_ids[selected] = i
+        self.set_materials(materials, material_ids)
+
+    def material_property(self, name: str) -> np.ndarray:
+        """Return a material property of each element, looked up in the material table.
+
+        :param name: Attribute of the Material class, e.g. 'rho' or 'young'.
+        """
+        return np.array([getattr(m, name) for m in self.materials])[self.material_ids]
+
     def reset(self):
-        """Reset elements properties. Use once in each step."""
-        for el in self.elements:
-            el.reset()
+        """Reset nodal properties. Use once in each step."""
+        self.grid.reset()
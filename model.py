@@ -1,125 +1,412 @@
-from mesh import Mesh
-from particle import Particle
-from element import Element
-from math import sqrt, floor, ceil
-from copy import deepcopy
+from .mesh import Mesh
+from .particle import Particle
+from .particle_set import ParticleSet
+from .element import Element
+from .engine import Engine
+from .recorder import Recorder
+from .interpolation import Interpolation
+from .time_step import AdaptiveTimeStep
+from .profiler import Profiler
+from .cell_sort import CellSort
+from .update_scheme import SCHEMES
+from .observer import Observer
+from .progress import Progress
+from math import ceil
+from typing import Iterator, TYPE_CHECKING
 import numpy as np
 
+if TYPE_CHECKING:
+    from .checkpoint import Checkpoint
+
 
 class Model:
+    ENGINES = ('vectorized', 'sparse', 'threaded', 'object')
+    SEEDINGS = ('uniform', 'gauss', 'jitter')
+
     mesh: Mesh
     num_particles_per_el: int
     total_time: float
+    engine: str
+    out_of_domain: str
+    cfl: float
+    adaptive_dt: AdaptiveTimeStep | None
+    scheme: str
+    basis: str
+    num_threads: int | None
+    seeding: str
+    seed: int | None
+    initial_dt: float
     dt: float
-    particles: list[Particle]
-    result: list[list[Particle]]
+    time: float
+    step_index: int
+    particle_set: ParticleSet
+    _particles: list[Particle] | None
+    solver: Engine
+    result: Recorder
+    observers: list[Observer]
 
-    def __init__(self, mesh: Mesh, num_particles_per_el: int, total_time: float):
+    def __init__(self, mesh: Mesh, num_particles_per_el: int, total_time: float, engine: str = 'vectorized',
+                 out_of_domain: str = 'raise', cfl: float = 0.1, adaptive_dt: AdaptiveTimeStep | None = None,
+                 scheme: str = 'usl', basis: str = 'linear', num_threads: int | None = None, seeding: str = 'uniform',
+                 seed: int | None = None):
         """Constructor.
 
         :param mesh: Mesh of domain.
         :param num_particles_per_el: Number of particles per element in the initial step.
         :param total_time: Total time of simulation
+        :param engine: 'vectorized' to solve over the particle and node arrays, 'sparse' to do the same with sparse
+            interpolation matrices, 'threaded' to do it in chunks of particles in a thread pool or 'object' to loop
+            over the `Particle` and `Node` objects.
+        :param out_of_domain: 'raise' to stop with a ValueError when a particle leaves the mesh or 'deactivate' to
+            ignore the particles outside the mesh.
+        :param cfl: Courant number of the fixed time step.
+        :param adaptive_dt: If given, the time step is recomputed in every step from the state of the particles.
+        :param scheme: Update scheme, 'usl', 'usf' or 'musl'. The 'object' engine only implements 'usl'.
+        :param basis: Shape functions, 'linear', 'gimp', 'bspline2' or 'bspline3'. The 'object' engine only
+            implements 'linear' and the others need a uniform mesh. With 'gimp', each particle spans its share of
+            the element length.
+        :param num_threads: Number of threads of the 'threaded' engine. By default, the number of CPUs.
+        :param seeding: Initial positions of the particles in each element, 'uniform' for equally spaced,
+            'gauss' for the Gauss-Legendre points, with masses and volumes proportional to the Gauss weights, or
+            'jitter' for one random position in each of the equal parts of the element.
+        :param seed: Seed of the random positions of 'jitter'.
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine must be one of {self.ENGINES}, not '{engine}'.")
+        if scheme not in SCHEMES:
+            raise ValueError(f"scheme must be one of {tuple(SCHEMES)}, not '{scheme}'.")
+        if engine == 'object' and scheme != 'usl':
+            raise ValueError(f"The 'object' engine only implements the 'usl' scheme, not '{scheme}'.")
+        if engine == 'object' and basis != 'linear':
+            raise ValueError(f"The 'object' engine only implements the 'linear' basis, not '{basis}'.")
+        if seeding not in self.SEEDINGS:
+            raise ValueError(f"seeding must be one of {self.SEEDINGS}, not '{seeding}'.")
+
         self.mesh = mesh
         self.num_particles_per_el = num_particles_per_el
         self.total_time = total_time
+        self.engine = engine
+        self.out_of_domain = out_of_domain
+        self.cfl = cfl
+        self.adaptive_dt = adaptive_dt
+        self.scheme = scheme
+        self.basis = basis
+        self.num_threads = num_threads
+        self.seeding = seeding
+        self.seed = seed
 
+        self.initial_dt = 0
         self.dt = 0
         self.define_dt()
 
-        self.particles = []
+        self.time = 0
+        self.step_index = 0
 
-        self.result = []
+        self.particle_set = ParticleSet(0)
+        self._particles = []
+
+        self.result = Recorder()
+        self.observers = []
 
         self.generate_particles()
 
     def generate_particles(self):
-        """Generate particles inside every element."""
-        for el in self.mesh.elements:
-            dx = el.length() / (self.num_particles_per_el + 1)
+        """Generate particles inside every element, directly into the particle arrays."""
+        n = self.num_particles_per_el
+        x = self.mesh.grid.x
+        x_ini, length = x[:-1, None], np.diff(x)[:, None]
+        mass = np.array([el.mass for el in self.mesh.elements])[:, None]
+        volume = np.array([el.volume for el in self.mesh.elements])[:, None]
+
+        # Position, mass and volume of the particles of each element, one row per element.
+        if self.seeding == 'gauss':
+            points, weights = np.polynomial.legendre.leggauss(n)
+            positions = x_ini + (points + 1) / 2 * length
+            masses, volumes = mass * weights / 2, volume * weights / 2
+        else:
+            if self.seeding == 'uniform':
+                positions = x_ini + np.arange(1, n + 1) * (length / (n + 1))
+            else:
+                jitter = np.random.default_rng(self.seed).random((len(length), n))
+                positions = x_ini + (np.arange(n) + jitter) / n * length
+            masses, volumes = np.repeat(mass / n, n, axis=1), np.repeat(volume / n, n, axis=1)
+
+        ps = ParticleSet(len(self.mesh.elements) * n)
+        ps.x[:] = positions.ravel()
+        ps.mass[:] = masses.ravel()
+        ps.initial_volume[:] = volumes.ravel()
+        ps.current_volume[:] = ps.initial_volume
+        ps.set_material_ids(self.mesh.materials, np.repeat(self.mesh.material_ids, n))
+
+        self.set_particles(ps)
+
+    def set_particles(self, particle_set: ParticleSet):
+        """Replace the particles of the model.
+
+        :param particle_set: State of the new particles.
+        """
+        self.particle_set = particle_set
+        self._particles = None
+
+        self.solver = Engine(self.particle_set, self.mesh.grid,
+                             mapping={'sparse': 'sparse', 'threaded': 'threaded'}.get(self.engine, 'scatter'),
+                             interpolation=Interpolation(self.mesh.grid, out_of_domain=self.out_of_domain,
+                                                         basis=self.basis, particle_length=self.particle_length()),
+                             scheme=self.scheme, num_threads=self.num_threads)
+
+    @property
+    def particles(self) -> list[Particle]:
+        """Return a `Particle` view of each particle, by ID. They are created on first use, since the solvers other
+        than the 'object' engine work on `particle_set` and do not need them."""
+        if self._particles is None:
+            self._particles = [Particle.view(self.particle_set, i) for i in self.positions()]
+        return self._particles
 
-            for i in range(self.num_particles_per_el):
-                p = Particle(x=el.x_ini() + (i + 1) * dx,
-                             mass=el.mass / self.num_particles_per_el,
-                             volume=el.volume / self.num_particles_per_el,
-                             material=el.material)
+    def set_initial_conditions(self, **fields):
+        """Set fields of the particles, e.g. `velocity=lambda x: v0 * np.sin(beta * x)`.
 
-                self.particles.append(p)
+        :param fields: For each field of `ParticleSet.FIELDS`, a scalar, an array with one value for each particle,
+            by ID, or a function of the array of positions, by ID, that returns one of them.
+        """
+        for field, value in fields.items():
+            ps = self.particle_set
+            ps.set_field(field, value(ps.in_id_order(ps.x)) if callable(value) else value)
+
+    def particle_length(self) -> float:
+        """Return the initial length of the domain of each particle, used by the GIMP basis."""
+        return self.mesh.elements_length() / self.num_particles_per_el
+
+    def positions(self) -> list[int]:
+        """Return the position of each particle, by ID, in the arrays of `particle_set`."""
+        ps = self.particle_set
+        return list(range(len(ps))) if ps.positions is None else ps.positions.tolist()
+
+    def sort_particles(self, sorter: CellSort):
+        """Reorder the particle arrays by element, keeping each `Particle` object attached to its particle.
+
+        :param sorter: Cell sort of the particles.
+        """
+        if sorter.sort(self.particle_set, self.solver.interpolation) and self._particles is not None:
+            for p, i in zip(self._particles, self.positions()):
+                p._index = i
 
     def element_that_contains_particle(self, particle: Particle) -> Element:
         """Return the element object that contains the reference particle.
 
         :param particle: Reference particle.
         """
-        n = floor((particle.x - self.mesh.x_ini) / self.mesh.elements_length())
-        return self.mesh.elements[n]
+        return self.mesh.elements[self.mesh.element_index(particle.x)]
 
     def max_elastic_wave_speed(self) -> float:
-        """Return the maximum elastic wave speed."""
-        return max([el.material.elastic_wave_speed() for el in self.mesh.elements])
+        """Return the maximum elastic wave speed, with the instantaneous modulus of each material."""
+        return np.sqrt(self.mesh.material_property('instantaneous_modulus') / self.mesh.material_property('rho')).max()
 
     def define_dt(self):
-        """Compute the dt value."""
-        self.dt = 0.1 * self.mesh.elements_length() / self.max_elastic_wave_speed()
-        n = ceil(self.total_time / self.dt)
-        self.dt = self.total_time / n
+        """Compute the fixed dt value, kept in `initial_dt`. `dt` is the time step of the current step."""
+        dt = self.cfl * self.mesh.min_elements_length() / self.max_elastic_wave_speed()
+        n = ceil(self.total_time / dt)
+        self.initial_dt = self.dt = self.total_time / n
 
     def number_of_steps(self) -> int:
-        """Return the number of time steps of solution."""
-        return round(self.total_time / self.dt)
+        """Return the number of time steps of solution. With adaptive dt, it is the estimate with the initial dt and
+        `step_index` is the number of steps taken after the solution."""
+        return round(self.total_time / self.initial_dt)
+
+    def time_steps(self, resume: bool = False) -> Iterator[tuple[int, float]]:
+        """Yield the index and initial time of each time step.
+
+        `dt` is set before each yield, recomputed from the current state if it is adaptive, and `time` and
+        `step_index` are advanced after the step.
+
+        :param resume: If True, continue from the current `time` and `step_index` instead of the beginning.
+        """
+        if not resume:
+            self.time = 0
+            self.step_index = 0
+            self.dt = self.initial_dt
+
+        # With adaptive dt, stop when the remaining time is a rounding residue of the accumulated time steps.
+        while (self.step_index < self.number_of_steps() if self.adaptive_dt is None else
+               self.total_time - self.time > 1e-12 * self.total_time):
+            if self.adaptive_dt is not None:
+                dt = self.adaptive_dt.compute(self.particle_set, self.mesh.grid, self.solver.interpolation)
+                self.dt = min(dt, self.total_time - self.time)
+
+            yield self.step_index, self.time
+
+            self.step_index += 1
+            self.time = self.step_index * self.initial_dt if self.adaptive_dt is None else self.time + self.dt
 
     def step_solve(self):
-        """Solve with USL for one time step."""
+        """Solve with the update scheme for one time step."""
+        if self.engine != 'object':
+            self.solver.step(self.dt, time=self.time)
+        else:
+            self.step_solve_objects()
+
+    def step_solve_objects(self):
+        """Solve with USL for one time step looping over the particle and node objects."""
+        prof = self.solver.profiler
+        if prof:
+            prof.start()
+
         self.reset()
-        # Shape functions and derivatives
-        for p in self.particles:
-            el = self.element_that_contains_particle(p)
-            for n in el.nodes:
-                n.map_mass_from_particle(p, el.length())
-                n.map_momentum_from_particle(p, el.length())
-                n.map_force_from_particle(p, el.length())
+        if prof:
+            prof.lap('reset')
+
+        # Elements, shape functions and derivatives in the positions of the beginning of the step.
+        cache = self.solver.interpolation
+        cache.update(self.particle_set.x)
+        els = [self.mesh.elements[i] for i in cache.elements.tolist()]
+        shapes = cache.shape.tolist()
+        diff_shapes = cache.diff_shape.tolist()
+        if prof:
+            prof.lap('interpolation')
+
+        # Map particles to nodes
+        for p, el, shape, diff_shape in zip(self.particles, els, shapes, diff_shapes):
+            for n, sh, dsh in zip(el.nodes, shape, diff_shape):
+                n.map_mass_from_particle(p, el.length(), shape=sh)
+                n.map_momentum_from_particle(p, el.length(), shape=sh)
+                n.map_force_from_particle(p, el.length(), diff_shape=dsh)
+        self.mesh.grid.apply_constraints(self.time, self.dt)
+        if prof:
+            prof.lap('p2g')
 
         # Update nodal momenta
         for n in self.mesh.nodes:
             n.update_momentum(self.dt)
+        if prof:
+            prof.lap('nodal_update')
 
         # Update particle velocity and position
-        for p in self.particles:
-            el = self.element_that_contains_particle(p)
-
-            for n in el.nodes:
-                p.update_velocity_from_node(node_shape=n.shape(p.x, el.length()),
+        for p, el, shape in zip(self.particles, els, shapes):
+            for n, sh in zip(el.nodes, shape):
+                p.update_velocity_from_node(node_shape=sh,
                                             node_force=n.force,
                                             node_mass=n.mass,
                                             dt=self.dt)
 
-                p.update_position_from_node(node_shape=n.shape(p.x, el.length()),
+                p.update_position_from_node(node_shape=sh,
                                             node_momentum=n.momentum,
                                             node_mass=n.mass,
                                             dt=self.dt)
+        if prof:
+            prof.lap('g2p')
 
         # Stress update
-        for p in self.particles:
-            el = self.element_that_contains_particle(p)
-
-            for n in el.nodes:
+        for p, el, diff_shape in zip(self.particles, els, diff_shapes):
+            for n, dsh in zip(el.nodes, diff_shape):
                 # n.update_velocity_from_particle(p, el.length())
-                p.update_velocity_gradient(n.diff_shape(p.x, el.length()), n.velocity())
+                p.update_velocity_gradient(dsh, n.velocity())
 
             p.update_deformation_gradient(self.dt)
             p.update_volume()
             p.update_strain_increment(self.dt)
-            p.update_stress()
+            p.update_stress(self.dt)
+        if prof:
+            prof.lap('stress')
+
+    def solve(self, recorder: Recorder | None = None, checkpoint: 'Checkpoint | None' = None, resume: bool = False,
+              profiler: Profiler | None = None, observers: list[Observer] | None = None,
+              progress: Progress | None = None, sorter: CellSort | None = None):
+        """Solve the problem for each time step
+
+        :param recorder: Recorder of the particle fields. By default, positions and velocities are saved in every step.
+        :param checkpoint: Writer of the checkpoints of the state during the solution.
+        :param resume: If True, continue a model restored with `Checkpoint.load` from its current step, appending to
+            its restored result. `recorder` is ignored.
+        :param profiler: Profiler that accumulates the time of each phase of the steps and of the time loop.
+        :param observers: Reductions computed during the solution, e.g. `CenterOfMass`. To keep only them, pass a
+            recorder without fields, `Recorder(fields=())`. When resuming, the observers restored by `Checkpoint.load`
+            continue and passing new ones is an error.
+        :param progress: Reporter of the progress. By default, a `Progress` that logs at most once per second.
+        :param sorter: If given, the particle arrays are periodically reordered by element. Not available with the
+            'object' engine.
+        """
+        if sorter is not None and self.engine == 'object':
+            raise ValueError("The 'object' engine does not support sorting the particles.")
+        if resume and observers is not None:
+            raise ValueError("A resumed solution continues the observers restored from the checkpoint; "
+                             "do not pass observers with resume=True.")
+
+        if not resume:
+            self.result = Recorder() if recorder is None else recorder
+            self.result.allocate(self.number_of_steps(), self.particle_set, self.initial_dt, self.metadata())
+
+            self.observers = [] if observers is None else observers
+            for o in self.observers:
+                o.allocate(self.number_of_steps())
+
+        if checkpoint is not None:
+            checkpoint.start(self.step_index if resume else 0)
+
+        progress = Progress() if progress is None else progress
+        progress.start(self.total_time, self.step_index, self.time)
+
+        prof = self.solver.profiler = profiler
+        if prof:
+            prof.start()
+
+        for i, t in self.time_steps(resume):
+            if prof:
+                prof.lap('time_step')
+
+            if checkpoint is not None and checkpoint.due(i):
+                checkpoint.save(self)
+                if prof:
+                    prof.lap('checkpoint')
+
+            if sorter is not None and sorter.due(i):
+                self.sort_particles(sorter)
+                if prof:
+                    prof.lap('sort')
 
-    def solve(self):
-        """Solve the problem for each time step"""
-        for t in self.discrete_time_steps():
             self.step_solve()
 
-            self.result.append(deepcopy(self.particles))
+            self.result.record(i, self.particle_set, t, self.dt)
+            if prof:
+                prof.lap('record')
+
+            for o in self.observers:
+                o.observe(i, self.particle_set, t)
+            if prof and self.observers:
+                prof.lap('observers')
+
+            progress.update(i + 1, t + self.dt)
+            if prof:
+                prof.lap('progress')
+
+        progress.finish()
+        self.result.close()
+        self.solver.profiler = None
 
-            print(f't:{t:.4f}s\tprogress:{100 * t / self.total_time:.2f}%')
+    def metadata(self) -> dict:
+        """Return a description of the model with built-in types."""
+        return {'dt': self.initial_dt,
+                'total_time': self.total_time,
+                'num_steps': self.number_of_steps(),
+                'cfl': self.cfl,
+                'adaptive_dt': None if self.adaptive_dt is None else {'cfl': self.adaptive_dt.cfl,
+                                                                      'dt_min': self.adaptive_dt.dt_min,
+                                                                      'dt_max': self.adaptive_dt.dt_max},
+                'num_particles': len(self.particle_set),
+                'num_particles_per_el': self.num_particles_per_el,
+                'engine': self.engine,
+                'scheme': self.scheme,
+                'basis': self.basis,
+                'seeding': self.seeding,
+                'seed': self.seed,
+                'out_of_domain': self.out_of_domain,
+                'mesh': {'x_ini': self.mesh.x_ini,
+                         'x_final': self.mesh.x_final,
+                         'num_els': self.mesh.num_els,
+                         'coordinates': None if self.mesh.is_uniform() else self.mesh.grid.x.tolist(),
+                         'fixed_nodes': np.flatnonzero(self.mesh.grid.is_fixed).tolist(),
+                         'velocity_nodes': self.mesh.grid.conditions.velocity_nodes.tolist(),
+                         'traction_nodes': self.mesh.grid.conditions.traction_nodes.tolist()},
+                'materials': [{'density': m.rho, 'young': m.young, 'model': m.model.name,
+                               'parameters': m.model.parameters()} for m in self.mesh.materials]}
 
     def reset(self):
         """Reset some properties of all elements. Use once for time step."""
@@ -1,12 +1,18 @@
 from math import fabs
-from particle import Particle
+from .particle import Particle
+from .grid import Grid
+from .array_field import ArrayField
+
 
 class Node:
-    x: float
-    is_fixed: bool
-    mass: float
-    force: float
-    momentum: float
+    x = ArrayField()
+    is_fixed = ArrayField()
+    mass = ArrayField()
+    force = ArrayField()
+    momentum = ArrayField()
+
+    _data: Grid
+    _index: int
 
     def __init__(self, x: float, is_fixed: bool = False):
         """Constructor.
@@ -14,12 +20,22 @@ class Node:
         :param x: Position.
         :param is_fixed: True if the node is constrained.
         """
-        self.x = x
+        self._data = Grid([x])
+        self._index = 0
+
         self.is_fixed = is_fixed
 
-        self.mass = 0
-        self.force = 0
-        self.momentum = 0
+    @classmethod
+    def view(cls, data: Grid, index: int) -> 'Node':
+        """Return a node whose state is stored in an entry of a grid.
+
+        :param data: Grid that owns the state.
+        :param index: Index of the node in the grid.
+        """
+        n = cls.__new__(cls)
+        n._data = data
+        n._index = index
+        return n
 
     def __str__(self):
         name = f"{self.__class__.__name__}"
@@ -35,22 +51,6 @@ class Node:
     def velocity(self) -> float:
         return self.momentum / self.mass
 
-    @property
-    def force(self) -> float:
-        return self._force
-
-    @force.setter
-    def force(self, value):
-        self._force = 0 if self.is_fixed else value
-
-    @property
-    def momentum(self) -> float:
-        return self._momentum
-
-    @momentum.setter
-    def momentum(self, value):
-        self._momentum = 0 if self.is_fixed else value
-
     def shape(self, xp: float, lx: float) -> float:
         if (self.x - lx) <= xp < (self.x + lx):
             return 1 - fabs(xp - self.x) / lx
@@ -65,29 +65,38 @@ class Node:
         else:
             return 0
 
-    def map_mass_from_particle(self, particle: Particle, lx: float):
+    def map_mass_from_particle(self, particle: Particle, lx: float, shape: float | None = None):
         """Increments the node mass with the contribution of the reference particle.
 
         :param particle: Reference particle.
         :param lx: Length of the reference element.
+        :param shape: Shape function of the node in the particle position, if already computed.
         """
-        self.mass += self.shape(particle.x, lx) * particle.mass
+        if shape is None:
+            shape = self.shape(particle.x, lx)
+        self.mass += shape * particle.mass
 
-    def map_momentum_from_particle(self, particle: Particle, lx: float):
+    def map_momentum_from_particle(self, particle: Particle, lx: float, shape: float | None = None):
         """Increments the node momentum with the contribution of the reference particle.
 
         :param particle: Reference particle
         :param lx: Length of the reference element.
+        :param shape: Shape function of the node in the particle position, if already computed.
         """
-        self.momentum += self.shape(particle.x, lx) * particle.momentum()
+        if shape is None:
+            shape = self.shape(particle.x, lx)
+        self.momentum += shape * particle.momentum()
 
-    def map_force_from_particle(self, particle: Particle, lx: float):
+    def map_force_from_particle(self, particle: Particle, lx: float, diff_shape: float | None = None):
         """Increments the node force with the contribution of the reference particle.
 
         :param particle: Reference particle
         :param lx: Length of the reference element.
+        :param diff_shape: Derivative of the shape function in the particle position, if already computed.
         """
-        self.force += -particle.stress * particle.current_volume * self.diff_shape(particle.x, lx)
+        if diff_shape is None:
+            diff_shape = self.diff_shape(particle.x, lx)
+        self.force += -particle.stress * particle.current_volume * diff_shape
 
     def update_momentum(self, dt: float):
         """Update the node momentum with explicit time integration."""
@@ -0,0 +1,178 @@
+import numpy as np
+
+from .particle_set import ParticleSet
+
+
+class Observer:
+    name: str
+    stride: int
+    values: np.ndarray
+    times: np.ndarray
+    num_observed: int
+
+    def __init__(self, name: str, stride: int = 1):
+        """Constructor. Reduce the state of the particles to a small value in every `stride` steps of the solution.
+
+        Only the series of reduced values is stored, so memory grows with the number of steps and not with the
+        number of particles. Subclasses implement `compute`, and `parameters` if their constructor has arguments
+        other than `stride`. Register them in OBSERVERS to restore them from a checkpoint.
+
+        :param name: Name of the observed quantity.
+        :param stride: Observe one of every `stride` time steps.
+        """
+        if stride < 1:
+            raise ValueError(f"stride must be a positive integer, not {stride}.")
+
+        self.name = name
+        self.stride = stride
+
+        self.values = np.zeros((0, self.width()))
+        self.times = np.zeros(0)
+        self.num_observed = 0
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(name='{self.name}', stride={self.stride}, n_values={len(self)})"
+
+    def __len__(self):
+        return self.num_observed
+
+    def width(self) -> int:
+        """Return the number of values computed in each step."""
+        return 1
+
+    def parameters(self) -> dict:
+        """Return the arguments of the constructor, to rebuild the observer."""
+        return {'stride': self.stride}
+
+    def compute(self, particles: ParticleSet) -> float | np.ndarray:
+        """Return the reduced value of the current state.
+
+        :param particles: State of the particles.
+        """
+        raise NotImplementedError
+
+    def allocate(self, num_steps: int):
+        """Allocate the series. It grows if more steps than `num_steps` are observed.
+
+        :param num_steps: Number of time steps of the solution, or an estimate of it.
+        """
+        n = max(-(-num_steps // self.stride), 1)
+
+        self.values = np.zeros((n, self.width()))
+        self.times = np.zeros(n)
+        self.num_observed = 0
+
+    def observe(self, step: int, particles: ParticleSet, time: float):
+        """Compute and save the value if the step is a multiple of the stride.
+
+        :param step: Index of the time step.
+        :param particles: State of the particles after the step.
+        :param time: Time at the beginning of the step.
+        """
+        if step % self.stride:
+            return
+
+        i = step // self.stride
+        if i >= len(self.times):
+            self.values = np.concatenate([self.values, np.zeros_like(self.values)])
+            self.times = np.concatenate([self.times, np.zeros_like(self.times)])
+
+        self.values[i] = self.compute(particles)
+        self.times[i] = time
+        self.num_observed = i + 1
+
+    def series(self) -> np.ndarray:
+        """Return the observed values, one row per observed step, or a vector if there is one value per step."""
+        values = self.values[:self.num_observed]
+        return values[:, 0] if self.width() == 1 else values
+
+    def time(self) -> np.ndarray:
+        """Return the time of each observed step."""
+        return self.times[:self.num_observed]
+
+
+class CenterOfMass(Observer):
+    field: str
+
+    def __init__(self, field: str = 'velocity', stride: int = 1):
+        """Constructor. Mass weighted average of a particle field, e.g. position or velocity of the center of mass.
+
+        :param field: Name of the `ParticleSet` field.
+        :param stride: Observe one of every `stride` time steps.
+        """
+        self.field = field
+        super().__init__(f'center_of_mass_{field}', stride)
+
+    def parameters(self) -> dict:
+        return {'field': self.field, 'stride': self.stride}
+
+    def compute(self, particles: ParticleSet) -> float:
+        return getattr(particles, self.field) @ particles.mass / particles.mass.sum()
+
+
+class KineticEnergy(Observer):
+    def __init__(self, stride: int = 1):
+        """Constructor. Total kinetic energy of the particles.
+
+        :param stride: Observe one of every `stride` time steps.
+        """
+        super().__init__('kinetic_energy', stride)
+
+    def compute(self, particles: ParticleSet) -> float:
+        return 0.5 * (particles.mass * particles.velocity) @ particles.velocity
+
+
+class StrainEnergy(Observer):
+    def __init__(self, stride: int = 1):
+        """Constructor. Total elastic strain energy of the particles, sum of stress^2 / (2 E) V.
+
+        :param stride: Observe one of every `stride` time steps.
+        """
+        super().__init__('strain_energy', stride)
+
+    def compute(self, particles: ParticleSet) -> float:
+        young = particles.young
+        density = np.divide(particles.stress ** 2, young, out=np.zeros(len(particles)), where=young > 0)
+        return 0.5 * density @ particles.current_volume
+
+
+class MaxStress(Observer):
+    def __init__(self, stride: int = 1):
+        """Constructor. Largest absolute stress among the particles.
+
+        :param stride: Observe one of every `stride` time steps.
+        """
+        super().__init__('max_stress', stride)
+
+    def compute(self, particles: ParticleSet) -> float:
+        return np.abs(particles.stress).max(initial=0)
+
+
+class Probe(Observer):
+    indices: np.ndarray
+    field: str
+
+    def __init__(self, indices: list[int] | np.ndarray, field: str = 'x', stride: int = 1):
+        """Constructor. Values of a particle field at chosen particles.
+
+        :param indices: IDs of the particles, their indices in the order they were created.
+        :param field: Name of the `ParticleSet` field.
+        :param stride: Observe one of every `stride` time steps.
+        """
+        self.indices = np.atleast_1d(np.asarray(indices, dtype=int))
+        self.field = field
+        super().__init__(f'probe_{field}', stride)
+
+    def width(self) -> int:
+        return len(self.indices)
+
+    def parameters(self) -> dict:
+        return {'indices': self.indices.tolist(), 'field': self.field, 'stride': self.stride}
+
+    def compute(self, particles: ParticleSet) -> np.ndarray:
+        positions = self.indices if particles.positions is None else particles.positions[self.indices]
+        return getattr(particles, self.field)[positions]
+
+
+OBSERVERS = {'CenterOfMass': CenterOfMass, 'KineticEnergy': KineticEnergy, 'StrainEnergy': StrainEnergy,
+             'MaxStress': MaxStress, 'Probe': Probe}
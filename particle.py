@@ -1,18 +1,26 @@
-from material import Material
+from .material import Material
+from .particle_set import ParticleSet
+from .array_field import ArrayField
 
 
 class Particle:
-    x: float
-    velocity: float
-    mass: float
-    initial_volume: float
-    current_volume: float
-    material: Material
-    stress: float
-    force: float
-    velocity_gradient: float
-    deformation_gradient: float
-    strain: float
+    x = ArrayField()
+    velocity = ArrayField()
+    mass = ArrayField()
+    initial_volume = ArrayField()
+    current_volume = ArrayField()
+    stress = ArrayField()
+    force = ArrayField()
+    velocity_gradient = ArrayField()
+    deformation_gradient = ArrayField()
+    strain = ArrayField()
+    strain_increment = ArrayField()
+    plastic_strain = ArrayField()
+    accumulated_plastic_strain = ArrayField()
+    viscous_stress = ArrayField()
+
+    _data: ParticleSet
+    _index: int
 
     def __init__(self, x: float, velocity: float = 0, mass: float = 0, volume: float = 0, material: Material = None):
         """Constructor.
@@ -23,6 +31,9 @@ class Particle:
         :param volume: Initial volume.
         :param material: Material.
         """
+        self._data = ParticleSet(1)
+        self._index = 0
+
         self.x = x
         self.velocity = velocity
         self.mass = mass
@@ -30,12 +41,17 @@ class Particle:
         self.current_volume = volume
         self.material = material
 
-        self.stress = 0
-        self.force = 0
-        self.velocity_gradient = 0
-        self.deformation_gradient = 1
-        self.strain = 0
-        self.strain_increment = 0
+    @classmethod
+    def view(cls, data: ParticleSet, index: int) -> 'Particle':
+        """Return a particle whose state is stored in a row of a particle set.
+
+        :param data: Particle set that owns the state.
+        :param index: Index of the particle in the set.
+        """
+        p = cls.__new__(cls)
+        p._data = data
+        p._index = index
+        return p
 
     def __str__(self):
         x = f"x={self.x}"
@@ -49,6 +65,15 @@ class Particle:
 
         return f"{name}({x}, {v}, {m}, {vol}, {mat}, {stress}, {force})"
 
+    @property
+    def material(self) -> Material:
+        i = self._data.material_id[self._index]
+        return None if i < 0 else self._data.materials[i]
+
+    @material.setter
+    def material(self, value: Material):
+        self._data.set_material(self._index, value)
+
     def momentum(self) -> float:
         """Return the momentum."""
         return self.mass * self.velocity
@@ -65,9 +90,12 @@ class Particle:
         """Update current volume based on deformation gradient."""
         self.current_volume = self.deformation_gradient * self.initial_volume
 
-    def update_stress(self):
-        """Increase stress value based on strain increment."""
-        self.stress += self.material.young * self.strain_increment
+    def update_stress(self, dt: float = 0):
+        """Update the stress from the strain increment with the constitutive model of the material.
+
+        :param dt: Time step, only used by rate-dependent models. By default, the instantaneous response.
+        """
+        self.material.model.update(self._data, self._index, dt)
 
     def update_strain_increment(self, dt: float):
         """Update strain increment based on velocity gradient."""
@@ -0,0 +1,201 @@
+from copy import copy
+
+import numpy as np
+
+from .material import Material
+
+
+class ParticleSet:
+    FIELDS = ('x', 'velocity', 'mass', 'initial_volume', 'current_volume', 'stress', 'force',
+              'velocity_gradient', 'deformation_gradient', 'strain', 'strain_increment', 'plastic_strain',
+              'accumulated_plastic_strain', 'viscous_stress')
+
+    x: np.ndarray
+    velocity: np.ndarray
+    mass: np.ndarray
+    initial_volume: np.ndarray
+    current_volume: np.ndarray
+    material_id: np.ndarray
+    materials: list[Material]
+    stress: np.ndarray
+    force: np.ndarray
+    velocity_gradient: np.ndarray
+    deformation_gradient: np.ndarray
+    strain: np.ndarray
+    strain_increment: np.ndarray
+    plastic_strain: np.ndarray
+    accumulated_plastic_strain: np.ndarray
+    viscous_stress: np.ndarray
+    positions: np.ndarray | None
+
+    def __init__(self, num_particles: int):
+        """Constructor. Store the state of all particles as contiguous arrays.
+
+        :param num_particles: Number of particles.
+        """
+        self.x = np.zeros(num_particles)
+        self.velocity = np.zeros(num_particles)
+        self.mass = np.zeros(num_particles)
+        self.initial_volume = np.zeros(num_particles)
+        self.current_volume = np.zeros(num_particles)
+        # Index of each particle's material in the material table, or -1 for particles without a material.
+        self.material_id = np.full(num_particles, -1)
+        self.materials = []
+
+        self.stress = np.zeros(num_particles)
+        self.force = np.zeros(num_particles)
+        self.velocity_gradient = np.zeros(num_particles)
+        self.deformation_gradient = np.ones(num_particles)
+        self.strain = np.zeros(num_particles)
+        self.strain_increment = np.zeros(num_particles)
+
+        # Internal variables of the constitutive models.
+        self.plastic_strain = np.zeros(num_particles)
+        self.accumulated_plastic_strain = np.zeros(num_particles)
+        self.viscous_stress = np.zeros(num_particles)
+
+        # Position of each particle, by ID, once the arrays are reordered. None while they are in ID order.
+        self.positions = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(n_particles={len(self)})"
+
+    def copy(self) -> 'ParticleSet':
+        """Return a copy of the particle set that does not share arrays with it."""
+        new = copy(self)
+        for f in self.FIELDS:
+            setattr(new, f, getattr(self, f).copy())
+        new.material_id = self.material_id.copy()
+        new.materials = list(self.materials)
+        new.positions = None if self.positions is None else self.positions.copy()
+
+        return new
+
+    def take(self, index) -> 'ParticleSet':
+        """Return a new particle set with the selected particles, in ID order.
+
+        :param index: Indices or mask of the selected particles, by ID.
+        """
+        new = ParticleSet(0)
+        for f in self.FIELDS + ('material_id',):
+            setattr(new, f, self.in_id_order(getattr(self, f))[index].copy())
+        new.materials = list(self.materials)
+
+        return new
+
+    def ids(self) -> np.ndarray:
+        """Return the ID of each particle, its index in the order the particles were created."""
+        if self.positions is None:
+            return np.arange(len(self))
+
+        ids = np.empty_like(self.positions)
+        ids[self.positions] = np.arange(len(self))
+        return ids
+
+    def in_id_order(self, values: np.ndarray) -> np.ndarray:
+        """Return the values of a field sorted by particle ID.
+
+        :param values: Values of a field in the current order of the particles.
+        """
+        return values if self.positions is None else values[self.positions]
+
+    def reorder(self, order: np.ndarray):
+        """Permute the particles in place, keeping their IDs.
+
+        :param order: Current index of the particle that goes to each position.
+        """
+        for f in self.FIELDS + ('material_id',):
+            a = getattr(self, f)
+            a[:] = a[order]
+
+        ids = self.ids()[order]
+        self.positions = np.empty_like(ids)
+        self.positions[ids] = np.arange(len(self))
+
+    def restore_order(self):
+        """Permute the particles back to ID order."""
+        if self.positions is not None:
+            self.reorder(self.positions)
+            self.positions = None
+
+    @property
+    def material(self) -> np.ndarray:
+        """Return the material object of each particle, None for particles without a material."""
+        table = np.empty(len(self.materials) + 1, dtype=object)
+        table[:-1] = self.materials
+        return table[self.material_id]
+
+    def material_index(self, material: Material) -> int:
+        """Return the index of a material in the material table, appending it if it is not there yet.
+
+        :param material: Material object, or None for no material.
+        """
+        if material is None:
+            return -1
+        for i, m in enumerate(self.materials):
+            if m is material:
+                return i
+
+        self.materials.append(material)
+        return len(self.materials) - 1
+
+    def set_material(self, index, material: Material):
+        """Assign a material to the particles selected by index.
+
+        :param index: Index, slice or mask of the particles.
+        :param material: Material object.
+        """
+        self.material_id[index] = self.material_index(material)
+
+    def set_material_ids(self, materials: list[Material], material_id: np.ndarray):
+        """Replace the material table and assign a material to each particle by its index in the table.
+
+        :param materials: Material table.
+        :param material_id: Index of the material of each particle, -1 for no material.
+        """
+        self.materials = list(materials)
+        self.material_id[:] = material_id
+
+    def material_property(self, name: str, index=slice(None)) -> np.ndarray:
+        """Return a material property of each particle, looked up in the material table. Zero without a material.
+
+        :param name: Attribute of the Material class, e.g. 'rho' or 'young'.
+        :param index: Index, slice or mask of the particles. By default, all of them.
+        """
+        table = np.zeros(len(self.materials) + 1)
+        table[:-1] = [getattr(m, name) for m in self.materials]
+        return table[self.material_id[index]]
+
+    @property
+    def young(self) -> np.ndarray:
+        """Return the Young modulus of each particle. Derived from the material table, so it is read-only: change
+        the material of the particles instead."""
+        young = self.material_property('young')
+        young.flags.writeable = False
+        return young
+
+    def set_field(self, field: str, values: float | np.ndarray):
+        """Set a field of all particles.
+
+        :param field: Name of the field, one of FIELDS.
+        :param values: Scalar, or array with one value for each particle, by ID.
+        """
+        if field not in self.FIELDS:
+            raise ValueError(f"field must be one of {self.FIELDS}, not '{field}'.")
+
+        values = np.broadcast_to(values, (len(self),))
+        if self.positions is None:
+            getattr(self, field)[:] = values
+        else:
+            getattr(self, field)[self.positions] = values
+
+    def momentum(self) -> np.ndarray:
+        """Return the momentum of all particles."""
+        return self.mass * self.velocity
+
+    def reset(self):
+        """Reset values for a step. Apply at each time step."""
+        self.velocity_gradient[:] = 0
@@ -1,64 +1,145 @@
-import matplotlib.pyplot as plt
+import os
+import subprocess
+from typing import TYPE_CHECKING
+
 import numpy as np
 
-from model import Model
+from .model import Model
+from .particle import Particle
+from .recorder import Recorder
+from .disk_recorder import DiskRecorder
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
 
 
 class Plot:
-    def __init__(self, model: Model):
+    model: Model | None
+    output_dir: str | None
+    _result: Recorder | None
+
+    def __init__(self, model: Model | None = None, result: Recorder | None = None, output_dir: str | None = None):
+        """Constructor. matplotlib is imported on the first plot, so solving a model does not depend on it.
+
+        :param model: Model to plot. Its result is plotted if `result` is None.
+        :param result: Result to plot without a model, e.g. a store opened with `DiskRecorder.open`.
+        :param output_dir: Directory where the figures are written as PNG files, rendered off-screen with the Agg
+            backend, e.g. on machines without a display. By default, figures are shown with pyplot.
+        """
         self.model = model
+        self.output_dir = output_dir
+        self._result = result
+
+    @classmethod
+    def open(cls, path: str) -> 'Plot':
+        """Return a plot of the result stored on disk by a `DiskRecorder`. Records are read lazily.
+
+        :param path: Directory of the store.
+        """
+        return cls(result=DiskRecorder.open(path))
+
+    @property
+    def result(self) -> Recorder:
+        return self.model.result if self._result is None else self._result
+
+    def subplots(self) -> tuple['Figure', 'Axes']:
+        """Return a new figure and its axes, drawn with pyplot or off-screen if the figures are written to files."""
+        if self.output_dir is None:
+            import matplotlib.pyplot as plt
+            return plt.subplots()
+
+        # A figure without pyplot is rendered by Agg and does not change the backend of the process.
+        from matplotlib.figure import Figure
+        fig = Figure()
+        return fig, fig.subplots()
+
+    def show(self, fig: 'Figure', name: str):
+        """Show a figure or, with `output_dir`, write it to `<output_dir>/<name>.png`.
+
+        :param fig: Figure to show.
+        :param name: Name of the file, without extension.
+        """
+        if self.output_dir is None:
+            import matplotlib.pyplot as plt
+            plt.show()
+            return
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        fig.savefig(os.path.join(self.output_dir, f'{name}.png'))
 
     def plot_initial_structure(self):
-        px = [p.x for p in self.model.particles]
-        nx = [n.x for n in self.model.mesh.nodes]
-        nx_fix = [n.x for n in self.model.mesh.nodes if n.is_fixed]
+        px = self.model.particle_set.x
+        nx = self.model.mesh.grid.x
+        nx_fix = nx[self.model.mesh.grid.is_fixed]
 
-        fig = plt.figure()
-        ax = fig.subplots()
+        fig, ax = self.subplots()
         # ax.plot(nx, len(nx)*[0], color='gray')
         ax.scatter(px, len(px) * [0], color='orange', label='Particle')
         ax.scatter(nx, len(nx) * [0], color='black', label='Free node')
         ax.scatter(nx_fix, len(nx_fix) * [0], color='red', label='Fixed node')
 
-        plt.legend()
-        plt.show()
+        ax.legend()
+        self.show(fig, 'initial_structure')
+
+    def number_of_records(self) -> int:
+        """Return the number of time steps saved in the result."""
+        return len(self.result)
+
+    def list_of_particle_in_time_step(self, i: int) -> list[Particle]:
+        """Return the particles of record i as `Particle` objects."""
+        data = self.result.snapshot(i, None if self.model is None else self.model.particle_set)
+        return [Particle.view(data, j) for j in range(len(data))]
+
+    def time_steps(self) -> np.ndarray:
+        """Return the time of each record, from the recorded time series."""
+        return self.result.time()
+
+    def statistics(self, field: str, chunk_size: int = 4096) -> dict[str, np.ndarray]:
+        """Return the minimum, maximum and mass weighted average of a recorded particle field in each record,
+        computed in one pass over the records.
 
-    def list_of_particle_in_time_step(self, i: int):
-        return self.model.result[i]
+        :param field: Name of the recorded field.
+        :param chunk_size: Number of records read at once. Bounds the memory used by results stored on disk.
+        """
+        m = self.result.initial_mass
+        w = m / m.sum()
+        a = getattr(self.result, field)
 
-    def time_steps(self) -> list[float]:
-        n = self.model.number_of_steps()
-        t = n * [0.0]
-        for i in range(1, n):
-            t[i] = t[i - 1] + self.model.dt
+        parts = {'min': [np.zeros(0)], 'max': [np.zeros(0)], 'center_of_mass': [np.zeros(0)]}
+        for i in range(0, len(a), chunk_size):
+            chunk = np.asarray(a[i:i + chunk_size])
+            parts['min'].append(chunk.min(axis=1))
+            parts['max'].append(chunk.max(axis=1))
+            parts['center_of_mass'].append(chunk @ w)
 
-        return t
+        return {k: np.concatenate(v) for k, v in parts.items()}
 
-    def particles_velocities_in_center_of_mass(self) -> list[float]:
-        total_mass = sum([p.mass for p in self.model.particles])
-        n = self.model.number_of_steps()
-        v = []
-        for i in range(n):
-            v.append(sum([p.velocity * p.mass / total_mass for p in self.list_of_particle_in_time_step(i)]))
+    def center_of_mass(self, field: str, chunk_size: int = 4096) -> np.ndarray:
+        """Return the mass weighted average of a recorded particle field in each record.
 
-        return v
+        :param field: Name of the recorded field.
+        :param chunk_size: Number of records read at once. Bounds the memory used by results stored on disk.
+        """
+        m = self.result.initial_mass
+        w = m / m.sum()
+        a = getattr(self.result, field)
 
-    def particles_positions_in_center_of_mass(self):
-        total_mass = sum([p.mass for p in self.model.particles])
-        n = self.model.number_of_steps()
-        x = []
-        for i in range(n):
-            x.append(sum([p.x * p.mass / total_mass for p in self.list_of_particle_in_time_step(i)]))
+        return np.concatenate([a[i:i + chunk_size] @ w for i in range(0, len(a), chunk_size)] or [np.zeros(0)])
 
-        return x
+    def particles_velocities_in_center_of_mass(self) -> np.ndarray:
+        return self.center_of_mass('velocity')
+
+    def particles_positions_in_center_of_mass(self) -> np.ndarray:
+        return self.center_of_mass('x')
 
     def plot_velocity_result_in_center_of_mass(self, va: list[float] | None = None):
         v = self.particles_velocities_in_center_of_mass()
         t = self.time_steps()
 
-        fig, ax = plt.subplots()
+        fig, ax = self.subplots()
 
-        if v is not None:
+        if va is not None:
             ax.plot(t, va, label='Analytical', color='black')
 
         ax.scatter(t, v, s=10, label='MPM', color='orange')
@@ -66,17 +147,19 @@ class Plot:
         ax.set_xlabel('Time (s)')
         ax.set_title('Velocity x Time')
 
-        plt.legend()
-        plt.show()
+        ax.legend()
+        self.show(fig, 'velocity_center_of_mass')
 
     def plot_velocity_error(self, va: list[float] | None = None):
-        plt.rc('font', size=12)  # controls default text sizes
-        plt.rc('axes', titlesize=14)  # fontsize of the axes title
-        plt.rc('axes', labelsize=12)  # fontsize of the x and y labels
-        plt.rc('xtick', labelsize=12)  # fontsize of the tick labels
-        plt.rc('ytick', labelsize=12)  # fontsize of the tick labels
-        plt.rc('legend', fontsize=12)  # legend fontsize
-        plt.rc('figure', titlesize=14)  # fontsize of the figure title
+        import matplotlib
+
+        matplotlib.rc('font', size=12)  # controls default text sizes
+        matplotlib.rc('axes', titlesize=14)  # fontsize of the axes title
+        matplotlib.rc('axes', labelsize=12)  # fontsize of the x and y labels
+        matplotlib.rc('xtick', labelsize=12)  # fontsize of the tick labels
+        matplotlib.rc('ytick', labelsize=12)  # fontsize of the tick labels
+        matplotlib.rc('legend', fontsize=12)  # legend fontsize
+        matplotlib.rc('figure', titlesize=14)  # fontsize of the figure title
 
         v = self.particles_velocities_in_center_of_mass()
         va_np = np.array(va)
@@ -84,21 +167,21 @@ class Plot:
 
         t = self.time_steps()
 
-        fig, ax = plt.subplots()
+        fig, ax = self.subplots()
 
         ax.plot(t, diff_v, label='Error', color='red')
         ax.set_ylabel('Velocity error')
         ax.set_xlabel('Time (s)')
         ax.set_title('Velocity error x Time')
 
-        plt.legend()
-        plt.show()
+        ax.legend()
+        self.show(fig, 'velocity_error')
 
     def plot_position_result_in_center_of_mass(self, xa: list[float] | None = None):
         x = self.particles_positions_in_center_of_mass()
         t = self.time_steps()
 
-        fig, ax = plt.subplots()
+        fig, ax = self.subplots()
 
         if xa is not None:
             ax.plot(t, xa, label='Analytical', color='black')
@@ -108,37 +191,169 @@ class Plot:
         ax.set_xlabel('Time (s)')
         ax.set_title('Position x Time')
 
-        plt.show()
+        self.show(fig, 'position_center_of_mass')
 
     def positions_particles_in_time_step(self, i: int) -> np.ndarray:
         """Return a vector of all particles in time step i"""
-        return np.array([p.x for p in self.list_of_particle_in_time_step(i)])
+        return np.asarray(self.result.x[i])
+
+    def frame_indices(self, max_frames: int | None = None) -> np.ndarray:
+        """Return the records shown in an animation, evenly decimated to at most max_frames.
+
+        :param max_frames: Maximum number of frames. All records if None.
+        """
+        n = self.number_of_records()
+        if max_frames is None or n <= max_frames:
+            return np.arange(n)
+
+        return np.unique(np.linspace(0, n - 1, max_frames).round().astype(int))
+
+    def displacement_range(self, scale: float = 60, records: np.ndarray | None = None,
+                           chunk_size: int = 4096) -> tuple[float, float]:
+        """Return the minimum and maximum position of the particles, with their displacements from the first record
+        amplified by scale.
+
+        :param scale: Amplification of the displacements.
+        :param records: Records to consider. All records if None.
+        :param chunk_size: Number of records read at once.
+        """
+        x = self.result.x
+        x0 = np.asarray(x[0])
+        records = np.arange(len(x)) if records is None else records
+
+        lo, hi = np.inf, -np.inf
+        for i in range(0, len(records), chunk_size):
+            chunk = x0 + scale * (np.asarray(x[records[i:i + chunk_size]]) - x0)
+            lo, hi = min(lo, chunk.min()), max(hi, chunk.max())
+
+        return float(lo), float(hi)
 
     def max_displacement_animation(self, scale=60):
-        xmax = -np.Inf
-        x0 = self.positions_particles_in_time_step(0)
-        for i in range(self.model.number_of_steps()):
-            x = x0 + scale * (self.positions_particles_in_time_step(i) - x0)
-            xmax = max(xmax, max(x))
+        return self.displacement_range(scale)[1]
 
-        return xmax
+    def animation_frames(self, ax: 'Axes', scale: float, records: np.ndarray):
+        """Draw the first frame of an animation of the particles and return the function that draws frame k.
 
-    def animate_solution(self, scale=60):
-        plt.ion()
-        fig, ax = plt.subplots()
-        x, y = [], []
-        sc = ax.scatter(x, y)
-        plt.xlim(self.model.mesh.x_ini, self.max_displacement_animation(scale))
+        The function only moves the artists it returns, which are animated: they are not drawn with the rest of the
+        figure, so the animation can be blitted over a background drawn once.
 
+        :param ax: Axes of the animation.
+        :param scale: Amplification of the displacements.
+        :param records: Record shown in each frame.
+        """
         x0 = self.positions_particles_in_time_step(0)
+        y = np.zeros(len(x0))
+        t = self.time_steps()
+        lo, hi = self.displacement_range(scale, records)
+
+        ax.set_xlim(min(lo, self.result.metadata['mesh']['x_ini']), hi)
+        ax.set_ylim(-1, 1)
+        ax.set_xlabel('Position')
+        sc = ax.scatter(x0, y, s=10, color='orange', animated=True)
+        label = ax.text(0.02, 0.9, '', transform=ax.transAxes, animated=True)
+
+        def draw(k: int):
+            i = records[k]
+            sc.set_offsets(np.column_stack([x0 + scale * (self.positions_particles_in_time_step(i) - x0), y]))
+            label.set_text(f"t = {t[i]:.4g} s")
+            return sc, label
+
+        return draw
+
+    def animate_solution(self, scale=60, max_frames: int | None = 500, interval: int = 20):
+        """Animate the particles with their displacements amplified by scale. With `output_dir`, the animation is
+        written to `<output_dir>/solution.gif` by `render_animation` instead.
+
+        :param scale: Amplification of the displacements.
+        :param max_frames: Maximum number of frames, evenly decimated from the records. All records if None.
+        :param interval: Delay between frames, in milliseconds.
+        """
+        if self.output_dir is not None:
+            self.render_animation(os.path.join(self.output_dir, 'solution.gif'), scale, max_frames)
+            return None
+
+        import matplotlib.pyplot as plt
+        from matplotlib.animation import FuncAnimation
+
+        records = self.frame_indices(max_frames)
+        fig, ax = plt.subplots()
+        draw = self.animation_frames(ax, scale, records)
+        animation = FuncAnimation(fig, draw, frames=len(records), interval=interval, blit=True)
+        plt.show()
+
+        return animation
 
-        plt.draw()
-        for i in range(self.model.number_of_steps()):
-            x = x0 + scale * (self.positions_particles_in_time_step(i) - x0)
-            y = np.zeros(len(x))
+    def render_frames(self, scale=60, max_frames: int | None = 500, dpi: int = 100):
+        """Yield the frames of an animation of the particles as RGBA images, rendered off-screen with the Agg
+        backend. The axes are drawn once and each frame only redraws the particles over them.
 
-            sc.set_offsets(np.c_[x, y])
-            fig.canvas.draw_idle()
-            plt.pause(0.00001)
+        :param scale: Amplification of the displacements.
+        :param max_frames: Maximum number of frames, evenly decimated from the records. All records if None.
+        :param dpi: Resolution of the frames.
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
 
-        plt.waitforbuttonpress()
+        fig = Figure(dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.subplots()
+        records = self.frame_indices(max_frames)
+        draw = self.animation_frames(ax, scale, records)
+
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+        for k in range(len(records)):
+            canvas.restore_region(background)
+            for artist in draw(k):
+                ax.draw_artist(artist)
+            yield np.array(canvas.buffer_rgba())
+
+    def render_animation(self, path: str, scale=60, max_frames: int | None = 500, fps: int = 30, dpi: int = 100):
+        """Write an animation of the particles without a display.
+
+        The format follows the extension of path: a '.gif' file is written with Pillow and other extensions, e.g.
+        '.mp4', with ffmpeg. A path without extension is a directory where each frame is written as a PNG file.
+
+        :param path: File or directory of the animation.
+        :param scale: Amplification of the displacements.
+        :param max_frames: Maximum number of frames, evenly decimated from the records. All records if None.
+        :param fps: Frames per second of the animation.
+        :param dpi: Resolution of the frames.
+        """
+        from PIL import Image
+
+        frames = self.render_frames(scale, max_frames, dpi)
+
+        if not os.path.splitext(path)[1]:
+            os.makedirs(path, exist_ok=True)
+            for k, frame in enumerate(frames):
+                Image.fromarray(frame).save(os.path.join(path, f'frame_{k:05d}.png'))
+            return
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if path.endswith('.gif'):
+            # The frames share the colors of the first one: mapping them to its palette is much faster than
+            # quantizing each frame, and palette images keep the frames, written at the end, small in memory.
+            first = Image.fromarray(next(frames)).convert('RGB').quantize()
+            images = [first] + [Image.fromarray(frame).convert('RGB').quantize(palette=first, dither=Image.Dither.NONE)
+                                for frame in frames]
+            first.save(path, save_all=True, append_images=images[1:], duration=1000 / fps, loop=0, optimize=False)
+            return
+
+        from matplotlib.animation import FFMpegWriter
+
+        if not FFMpegWriter.isAvailable():
+            raise ValueError(f"Writing '{path}' needs ffmpeg. Write a '.gif' file or a directory of frames instead.")
+
+        first = next(frames)
+        height, width = first.shape[:2]
+        command = [FFMpegWriter.bin_path(), '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                   '-s', f'{width}x{height}', '-r', str(fps), '-i', '-', '-pix_fmt', 'yuv420p', path]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as ffmpeg:
+            ffmpeg.stdin.write(first.tobytes())
+            for frame in frames:
+                ffmpeg.stdin.write(frame.tobytes())
+            ffmpeg.stdin.close()
+
+        if ffmpeg.returncode:
+            raise RuntimeError(f"ffmpeg failed to write '{path}' with exit status {ffmpeg.returncode}.")
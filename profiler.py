@@ -0,0 +1,86 @@
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+
+
+class Profiler:
+    samples: bool
+    callback: Callable[[str, float], None] | None
+    seconds: dict[str, float]
+    calls: dict[str, int]
+    phase_samples: dict[str, list[float]]
+    last: float
+
+    def __init__(self, samples: bool = False, callback: Callable[[str, float], None] | None = None):
+        """Constructor. Accumulate the wall time of the phases of the solution.
+
+        The code being measured calls `start` and then `lap` at the end of each phase, which charges the time
+        since the previous mark to the phase. Without a profiler, the solver skips these calls.
+
+        :param samples: If True, keep the duration of every call of each phase.
+        :param callback: Function called with the name and duration of each phase when it ends.
+        """
+        self.samples = samples
+        self.callback = callback
+
+        self.seconds = {}
+        self.calls = {}
+        self.phase_samples = {}
+        self.last = perf_counter()
+
+    def __str__(self):
+        total = self.total()
+        lines = [f"{'phase':<16}{'calls':>10}{'seconds':>12}{'mean (us)':>12}{'%':>8}"]
+        for name, seconds in self.seconds.items():
+            calls = self.calls[name]
+            lines.append(f"{name:<16}{calls:>10}{seconds:>12.4f}{1e6 * seconds / calls:>12.2f}"
+                         f"{100 * seconds / total if total else 0:>8.1f}")
+        lines.append(f"{'total':<16}{'':>10}{total:>12.4f}")
+
+        return '\n'.join(lines)
+
+    def start(self):
+        """Mark the beginning of the first phase."""
+        self.last = perf_counter()
+
+    def lap(self, name: str):
+        """Charge the time since the previous mark to a phase and mark the beginning of the next one.
+
+        :param name: Name of the phase that ended.
+        """
+        now = perf_counter()
+        dt = now - self.last
+        self.last = now
+
+        self.seconds[name] = self.seconds.get(name, 0) + dt
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.samples:
+            self.phase_samples.setdefault(name, []).append(dt)
+        if self.callback is not None:
+            self.callback(name, dt)
+
+    def total(self) -> float:
+        """Return the accumulated time of all phases."""
+        return sum(self.seconds.values())
+
+    def report(self) -> dict[str, dict]:
+        """Return the calls, accumulated and mean seconds and fraction of the total time of each phase, and its
+        samples if they are kept."""
+        total = self.total()
+        report = {}
+        for name, seconds in self.seconds.items():
+            report[name] = {'calls': self.calls[name],
+                            'seconds': seconds,
+                            'mean': seconds / self.calls[name],
+                            'fraction': seconds / total if total else 0}
+            if self.samples:
+                report[name]['samples'] = np.array(self.phase_samples[name])
+
+        return report
+
+    def reset(self):
+        """Discard the accumulated times."""
+        self.seconds = {}
+        self.calls = {}
+        self.phase_samples = {}
@@ -0,0 +1,120 @@
+import logging
+import time as clock
+from typing import Callable
+
+LOGGER = logging.getLogger('mpm.progress')
+
+
+class Progress:
+    interval: float
+    quiet: bool
+    callback: Callable[['Progress'], None] | None
+    logger: logging.Logger
+    level: int
+    total_time: float
+    step: int
+    time: float
+    start_step: int
+    start_time: float
+    wall_start: float
+    last_report: float
+    reported_step: int
+
+    def __init__(self, interval: float = 1.0, quiet: bool = False, callback: Callable[['Progress'], None] | None = None,
+                 logger: logging.Logger | None = None, level: int = logging.INFO):
+        """Constructor. Report the progress of a solution at most once every `interval` seconds of wall time.
+
+        Each report is a log record with the simulated time, the percentage done, the rate in steps per second and
+        the estimated remaining wall time. The first and the last steps are always reported.
+
+        :param interval: Minimum wall time between reports in seconds. 0 reports every step.
+        :param quiet: If True, nothing is reported.
+        :param callback: Function called with this object at each report instead of logging it.
+        :param logger: Logger of the reports. By default, the `mpm.progress` logger.
+        :param level: Logging level of the reports.
+        """
+        if interval < 0:
+            raise ValueError(f"interval must be non-negative, not {interval}.")
+
+        self.interval = interval
+        self.quiet = quiet
+        self.callback = callback
+        self.logger = LOGGER if logger is None else logger
+        self.level = level
+
+        self.total_time = 0
+        self.step = 0
+        self.time = 0
+        self.start_step = 0
+        self.start_time = 0
+        self.wall_start = 0
+        self.last_report = 0
+        self.reported_step = -1
+
+    def __str__(self):
+        return (f"t:{self.time:.4f}s\tprogress:{100 * self.fraction():.2f}%\t"
+                f"{self.rate():.1f} steps/s\tETA:{self.eta():.1f}s")
+
+    def start(self, total_time: float, step: int = 0, time: float = 0):
+        """Start the clock of a solution.
+
+        :param total_time: Simulated time at the end of the solution.
+        :param step: Index of the first time step, not 0 when resuming.
+        :param time: Simulated time at the first time step.
+        """
+        self.total_time = total_time
+        self.step = self.start_step = step
+        self.time = self.start_time = time
+        self.wall_start = clock.perf_counter()
+        self.last_report = -float('inf')
+        self.reported_step = -1
+
+    def update(self, step: int, time: float):
+        """Save the state after a time step and report it if `interval` has passed since the last report.
+
+        :param step: Number of time steps done.
+        :param time: Simulated time after the step.
+        """
+        self.step = step
+        self.time = time
+
+        if self.quiet:
+            return
+
+        now = clock.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def finish(self):
+        """Report the last state if it was not reported already."""
+        if not self.quiet and self.step != self.reported_step:
+            self.report()
+
+    def report(self):
+        """Send the current state to the callback or the logger."""
+        self.reported_step = self.step
+        if self.callback is not None:
+            self.callback(self)
+        else:
+            self.logger.log(self.level, '%s', self)
+
+    def elapsed(self) -> float:
+        """Return the wall time since `start` in seconds."""
+        return clock.perf_counter() - self.wall_start
+
+    def fraction(self) -> float:
+        """Return the fraction of the simulated time done."""
+        return self.time / self.total_time if self.total_time > 0 else 1.0
+
+    def rate(self) -> float:
+        """Return the number of time steps per second of wall time."""
+        elapsed = self.elapsed()
+        return (self.step - self.start_step) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> float:
+        """Return the estimated wall time to finish in seconds."""
+        done = self.time - self.start_time
+        if done <= 0:
+            return float('inf')
+        return self.elapsed() * max(self.total_time - self.time, 0) / done
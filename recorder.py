@@ -0,0 +1,164 @@
+import numpy as np
+
+from .particle_set import ParticleSet
+
+
+class Recorder:
+    SERIES = ('step', 'time', 'step_dt')
+
+    fields: tuple[str, ...]
+    stride: int
+    dtype: np.dtype
+    data: dict[str, np.ndarray]
+    series: dict[str, np.ndarray]
+    num_recorded: int
+    dt: float
+    initial_mass: np.ndarray
+    metadata: dict
+
+    def __init__(self, fields: tuple[str, ...] = ('x', 'velocity'), stride: int = 1, dtype=np.float64):
+        """Constructor. Record particle fields in preallocated arrays of shape (n_records, n_particles).
+
+        The index, start time and time step of each recorded step are saved in the series `step`, `time` and
+        `step_dt`. The masses of the particles at the start are kept in `initial_mass`, e.g. to weight averages.
+
+        :param fields: Names of the `ParticleSet` fields to record.
+        :param stride: Record one of every `stride` time steps.
+        :param dtype: Data type of the recorded arrays.
+        """
+        unknown = [f for f in fields if f not in ParticleSet.FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown particle fields {unknown}. Valid fields are {ParticleSet.FIELDS}.")
+        if stride < 1:
+            raise ValueError(f"stride must be a positive integer, not {stride}.")
+
+        self.fields = tuple(fields)
+        self.stride = stride
+        self.dtype = np.dtype(dtype)
+
+        self.data = {}
+        self.series = {}
+        self.num_recorded = 0
+
+        self.dt = 0
+        self.initial_mass = np.zeros(0)
+        self.metadata = {}
+
+    def __str__(self):
+        fields = f"fields={self.fields}"
+        stride = f"stride={self.stride}"
+        n = f"n_records={len(self)}"
+
+        return f"{self.__class__.__name__}({fields}, {stride}, {n})"
+
+    def __len__(self):
+        return self.num_recorded
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Only called for missing attributes, so recorded fields and series read as `recorder.x`.
+        for arrays in (self.__dict__.get('data', {}), self.__dict__.get('series', {})):
+            if name in arrays:
+                return arrays[name][:self.num_recorded]
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
+    def capacity(self) -> int:
+        """Return the number of records that fit in the allocated arrays."""
+        return len(self.series['step']) if self.series else 0
+
+    def num_records(self, num_steps: int) -> int:
+        """Return the number of records saved in a solution with `num_steps` time steps."""
+        return -(-num_steps // self.stride)
+
+    def time(self) -> np.ndarray:
+        """Return the time of each saved record."""
+        return self.series['time'][:self.num_recorded] if self.series else np.zeros(0)
+
+    def nbytes(self) -> int:
+        """Return the memory allocated for the records in bytes."""
+        return sum(a.nbytes for a in self.data.values()) + sum(a.nbytes for a in self.series.values())
+
+    def allocate(self, num_steps: int, particles: ParticleSet, dt: float, metadata: dict | None = None):
+        """Allocate the arrays of the records. They grow if more steps than `num_steps` are recorded.
+
+        :param num_steps: Number of time steps of the solution, or an estimate of it.
+        :param particles: Particles to record.
+        :param dt: Time step of the solution, or its initial value if it changes in each step.
+        :param metadata: Description of the model that produced the records.
+        """
+        n = max(self.num_records(num_steps), 1)
+
+        self.data = {f: self.empty_field(f, (n, len(particles)), self.dtype) for f in self.fields}
+        self.series = {'step': self.empty_field('step', (n,), np.int64),
+                       'time': self.empty_field('time', (n,), np.float64),
+                       'step_dt': self.empty_field('step_dt', (n,), np.float64)}
+        self.num_recorded = 0
+
+        self.dt = dt
+        self.initial_mass = particles.in_id_order(particles.mass).copy()
+        self.metadata = {} if metadata is None else metadata
+
+    def empty_field(self, name: str, shape: tuple[int, ...], dtype) -> np.ndarray:
+        """Return the uninitialized array that stores a field or a series.
+
+        :param name: Name of the field or series.
+        :param shape: Shape of the array.
+        :param dtype: Data type of the array.
+        """
+        return np.empty(shape, dtype=dtype)
+
+    def grow(self):
+        """Double the number of records that fit in the arrays."""
+        n = self.capacity()
+        for arrays in (self.data, self.series):
+            for name, a in arrays.items():
+                new = self.empty_field(name, (max(2 * n, 1),) + a.shape[1:], a.dtype)
+                new[:n] = a
+                arrays[name] = new
+
+    def record(self, step: int, particles: ParticleSet, time: float | None = None, dt: float | None = None):
+        """Save the recorded fields of the particles if the step is a multiple of the stride.
+
+        :param step: Index of the time step.
+        :param particles: State of the particles after the step.
+        :param time: Time at the beginning of the step. Defaults to `step * dt`.
+        :param dt: Time step taken. Defaults to the time step given in `allocate`.
+        """
+        if step % self.stride:
+            return
+
+        i = step // self.stride
+        while i >= self.capacity():
+            self.grow()
+
+        # Records are kept in particle ID order, whatever the current order of the particles.
+        for f, a in self.data.items():
+            a[i] = particles.in_id_order(getattr(particles, f))
+
+        dt = self.dt if dt is None else dt
+        self.series['step'][i] = step
+        self.series['time'][i] = step * dt if time is None else time
+        self.series['step_dt'][i] = dt
+
+        self.num_recorded = i + 1
+
+    def close(self):
+        """Finish the recording. Called once at the end of the solution."""
+
+    def snapshot(self, i: int, particles: ParticleSet | None = None) -> ParticleSet:
+        """Return the particles with the recorded fields replaced by the values of record i.
+
+        :param i: Index of the record.
+        :param particles: Particles that supply the fields that are not recorded. If None, only the initial mass and
+            the recorded fields are set.
+        """
+        if particles is None:
+            snapshot = ParticleSet(len(self.initial_mass))
+            snapshot.mass[:] = self.initial_mass
+        else:
+            snapshot = particles.copy()
+            snapshot.restore_order()
+
+        for f in self.fields:
+            getattr(snapshot, f)[:] = getattr(self, f)[i]
+
+        return snapshot
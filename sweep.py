@@ -0,0 +1,162 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from math import ceil, pi, sqrt
+from typing import Callable
+
+import numpy as np
+
+from .material import Material
+from .mesh import Mesh
+from .model import Model
+from .observer import CenterOfMass
+from .progress import Progress
+from .recorder import Recorder
+
+
+def build_bar(num_els: int = 25, num_particles_per_el: int = 2, young: float = 100, density: float = 1,
+              total_time: float = 140, length: float = 25, v0: float = 0.1, mode: int = 1,
+              engine: str = 'vectorized', basis: str = 'linear') -> Model:
+    """Return the model of the bar fixed at x=0 vibrating in a mode, as in example_2. The mesh extends past the free
+    end of the bar by at least twice the amplitude of its displacement, so the particles stay inside it.
+
+    :param num_els: Number of elements.
+    :param num_particles_per_el: Number of particles per element.
+    :param young: Young modulus.
+    :param density: Density.
+    :param total_time: Total time of simulation.
+    :param length: Length of the bar.
+    :param v0: Velocity amplitude.
+    :param mode: Vibration mode.
+    :param engine: Engine of the model.
+    :param basis: Shape functions of the model.
+    """
+    material = Material(density, young)
+    beta_n = (pi / length) * (2 * mode - 1) / 2
+
+    element_length = length / num_els
+    num_extra_els = max(1, ceil(2 * v0 / (beta_n * sqrt(young / density)) / element_length))
+
+    mesh = Mesh(x_ini=0, x_final=length + num_extra_els * element_length, num_els=num_els + num_extra_els)
+    mesh.generate_mesh(material)
+
+    model = Model(mesh=mesh, num_particles_per_el=num_particles_per_el, total_time=total_time, engine=engine,
+                  basis=basis)
+    model.set_particles(model.particle_set.take(model.particle_set.x < length))
+    model.set_initial_conditions(velocity=lambda x: v0 * np.sin(beta_n * x))
+
+    mesh.nodes[0].is_fixed = True
+
+    return model
+
+
+def bar_velocity_in_center_of_mass(t: np.ndarray, young: float = 100, density: float = 1, length: float = 25,
+                                   v0: float = 0.1, mode: int = 1, **kwargs) -> np.ndarray:
+    """Return the analytical velocity of the center of mass of the bar built by `build_bar`.
+
+    :param t: Time instants.
+    """
+    beta_n = (pi / length) * (2 * mode - 1) / 2
+    omega_n = beta_n * sqrt(young / density)
+
+    return v0 * np.cos(omega_n * t) / (beta_n * length)
+
+
+def run_case(build: Callable[..., Model], case: dict, analytical: Callable[..., np.ndarray] | None = None) -> dict:
+    """Build and solve one model and return only its reduced results. If it fails, the row has the exception in
+    'failure' instead of the results, which is empty for the cases that succeed.
+
+    :param build: Function that returns the model from the parameters of the case.
+    :param case: Parameters of the case.
+    :param analytical: Function of the time instants and parameters that returns the analytical velocity of the
+        center of mass.
+    """
+    start = time.perf_counter()
+    row = dict(case)
+
+    try:
+        model = build(**case)
+
+        center_of_mass = CenterOfMass('velocity')
+        model.solve(Recorder(fields=()), observers=[center_of_mass], progress=Progress(quiet=True))
+    except Exception as e:
+        row.update(failure=f"{e.__class__.__name__}: {e}", wall_time=time.perf_counter() - start)
+        return row
+
+    velocity = center_of_mass.series()
+
+    row.update(failure='',
+               num_particles=len(model.particle_set),
+               dt=model.initial_dt,
+               num_steps=model.step_index,
+               wall_time=time.perf_counter() - start,
+               time=center_of_mass.time(),
+               velocity=velocity)
+
+    if analytical is not None:
+        error = np.abs(velocity - analytical(center_of_mass.time(), **case))
+        row.update(max_error=error.max(), rms_error=sqrt(np.mean(error ** 2)), error=error)
+
+    return row
+
+
+class Sweep:
+    build: Callable[..., Model]
+    parameters: dict[str, list]
+    analytical: Callable[..., np.ndarray] | None
+    max_workers: int | None
+
+    def __init__(self, parameters: dict[str, list], build: Callable[..., Model] = build_bar,
+                 analytical: Callable[..., np.ndarray] | None = bar_velocity_in_center_of_mass,
+                 max_workers: int | None = None):
+        """Constructor. Solve every combination of parameters in a pool of processes.
+
+        `build` and `analytical` must be module level functions, so they can be sent to the worker processes. Each
+        worker returns only the reduced results of its case, never the model.
+
+        :param parameters: Values of each parameter of `build`. The cases are their cartesian product.
+        :param build: Function that returns the model from the parameters of a case.
+        :param analytical: Function of the time instants and parameters that returns the analytical velocity of the
+            center of mass, or None to skip the error.
+        :param max_workers: Number of processes. Defaults to the number of cores. With 1, cases run in this process.
+        """
+        self.parameters = parameters
+        self.build = build
+        self.analytical = analytical
+        self.max_workers = max_workers
+
+    def __len__(self):
+        return len(self.cases())
+
+    def cases(self) -> list[dict]:
+        """Return the parameters of every case."""
+        names = list(self.parameters)
+        return [dict(zip(names, values)) for values in product(*self.parameters.values())]
+
+    def run(self) -> dict[str, np.ndarray]:
+        """Solve all cases and return their results as a table of columns with one row per case.
+
+        Scalar results are numeric columns and the time series (time, velocity and error) are object columns. A case
+        that fails does not stop the others: its exception is in the 'failure' column and its results are NaN or None.
+        """
+        cases = self.cases()
+        n = len(cases)
+
+        if self.max_workers == 1:
+            rows = [run_case(self.build, c, self.analytical) for c in cases]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                rows = list(executor.map(run_case, n * [self.build], cases, n * [self.analytical]))
+
+        table = {}
+        for name in dict.fromkeys(name for r in rows for name in r):
+            values = [r.get(name) for r in rows]
+            if any(isinstance(v, np.ndarray) for v in values):
+                column = np.empty(n, dtype=object)
+                for i, v in enumerate(values):
+                    column[i] = v
+            else:
+                column = np.array([np.nan if v is None else v for v in values])
+            table[name] = column
+
+        return table
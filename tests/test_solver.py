@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from ..cell_sort import CellSort
+from ..checkpoint import Checkpoint
+from ..decomposition import DomainDecomposition
+from ..interpolation import Interpolation
+from ..mesh import Mesh
+from ..material import Material
+from ..model import Model
+from ..progress import Progress
+from ..sweep import build_bar
+
+TOTAL_TIME = 2
+QUIET = Progress(quiet=True)
+
+
+def solved(model: Model) -> Model:
+    """Solve a model quietly and return it."""
+    model.solve(progress=QUIET)
+    return model
+
+
+def state(model: Model) -> np.ndarray:
+    """Return the positions, velocities and stresses of the particles of a model, by ID."""
+    ps = model.particle_set
+    return np.stack([ps.in_id_order(ps.x), ps.in_id_order(ps.velocity), ps.in_id_order(ps.stress)])
+
+
+@pytest.fixture(scope='module')
+def reference() -> Model:
+    return solved(build_bar(total_time=TOTAL_TIME))
+
+
+def test_object_engine_matches_vectorized(reference):
+    model = solved(build_bar(total_time=TOTAL_TIME, engine='object'))
+    x = np.array([[p.x, p.velocity, p.stress] for p in model.particles]).T
+    np.testing.assert_array_equal(x, state(reference))
+
+
+def test_restart_is_bit_for_bit(reference, tmp_path, monkeypatch):
+    class Stop(Exception):
+        pass
+
+    step_solve = Model.step_solve
+
+    def interrupted(model):
+        if model.step_index == 150:
+            raise Stop
+        step_solve(model)
+
+    path = tmp_path / 'checkpoint.npz'
+    monkeypatch.setattr(Model, 'step_solve', interrupted)
+    with pytest.raises(Stop):
+        build_bar(total_time=TOTAL_TIME).solve(checkpoint=Checkpoint(path, every_steps=100), progress=QUIET)
+    monkeypatch.setattr(Model, 'step_solve', step_solve)
+
+    model = Checkpoint.load(path)
+    assert model.step_index == 100
+    model.solve(resume=True, progress=QUIET)
+    np.testing.assert_array_equal(state(model), state(reference))
+    np.testing.assert_array_equal(model.result.x, reference.result.x)
+    np.testing.assert_array_equal(model.result.velocity, reference.result.velocity)
+
+
+@pytest.mark.parametrize('num_domains', [2, 3])
+@pytest.mark.parametrize('sort', [False, True])
+def test_decomposition_matches_single_process(reference, num_domains, sort):
+    model = build_bar(total_time=TOTAL_TIME)
+    if sort:
+        model.particle_set.reorder(np.random.default_rng(0).permutation(len(model.particle_set)))
+        model.sort_particles(CellSort())
+    DomainDecomposition(model, num_domains).solve(progress=QUIET)
+    np.testing.assert_allclose(state(model), state(reference), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(model.result.x, reference.result.x, rtol=0, atol=1e-12)
+
+
+def threaded(num_threads: int) -> Model:
+    """Solve the bar with the 'threaded' engine in small chunks, so every thread takes part."""
+    model = build_bar(total_time=TOTAL_TIME, engine='threaded')
+    model.num_threads = num_threads
+    model.set_particles(model.particle_set)
+    model.solver.chunk_size = 7
+    return solved(model)
+
+
+def test_threaded_engine_is_independent_of_threads(reference):
+    single = state(threaded(1))
+    np.testing.assert_allclose(single, state(reference), rtol=0, atol=1e-12)
+    for num_threads in (2, 4):
+        np.testing.assert_array_equal(state(threaded(num_threads)), single)
+
+
+@pytest.mark.parametrize('basis', ['linear', 'gimp', 'bspline2', 'bspline3'])
+def test_partition_of_unity(basis):
+    mesh = Mesh(x_ini=0, x_final=10, num_els=10)
+    mesh.generate_mesh(Material(1, 100))
+    interpolation = Interpolation(mesh.grid, basis=basis, particle_length=0.5)
+    x = np.linspace(0, 10, 101)
+    interpolation.update(x)
+    np.testing.assert_allclose(interpolation.shape.sum(axis=1), 1, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(interpolation.diff_shape.sum(axis=1), 0, rtol=0, atol=1e-12)
+    np.testing.assert_allclose((interpolation.shape * mesh.grid.x[interpolation.nodes]).sum(axis=1), x, atol=1e-12)
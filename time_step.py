@@ -0,0 +1,53 @@
+import numpy as np
+
+from .grid import Grid
+from .interpolation import Interpolation
+from .particle_set import ParticleSet
+
+
+class AdaptiveTimeStep:
+    cfl: float
+    dt_min: float
+    dt_max: float
+
+    def __init__(self, cfl: float = 0.1, dt_min: float = 0, dt_max: float = np.inf):
+        """Constructor. Stable time step recomputed in every step from the current state of the particles.
+
+        dt = cfl * min(h / (c + |v|)) over the particles, where h is the length of the element that contains the
+        particle, c = sqrt(E / rho) its current elastic wave speed, with the instantaneous modulus E of its material,
+        and v its velocity.
+
+        :param cfl: Courant number.
+        :param dt_min: Lower bound of the time step.
+        :param dt_max: Upper bound of the time step.
+        """
+        if not 0 < cfl <= 1:
+            raise ValueError(f"cfl must be in (0, 1], not {cfl}.")
+        if not 0 <= dt_min <= dt_max:
+            raise ValueError(f"Time step bounds must satisfy 0 <= dt_min <= dt_max, not [{dt_min}, {dt_max}].")
+
+        self.cfl = cfl
+        self.dt_min = dt_min
+        self.dt_max = dt_max
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(cfl={self.cfl}, dt_min={self.dt_min}, dt_max={self.dt_max})"
+
+    def compute(self, particles: ParticleSet, grid: Grid, interpolation: Interpolation) -> float:
+        """Return the stable time step of the current state.
+
+        :param particles: State of the particles.
+        :param grid: Mesh nodes.
+        :param interpolation: Interpolation cache, used to locate the particles.
+        """
+        interpolation.locate(particles.x)
+        h = grid.elements_length[interpolation.cells]
+
+        density = np.divide(particles.mass, particles.current_volume, out=np.full(len(particles), np.inf),
+                            where=particles.current_volume > 0)
+        speed = np.sqrt(particles.material_property('instantaneous_modulus') / density) + np.abs(particles.velocity)
+
+        with np.errstate(divide='ignore'):
+            dt = self.cfl * np.min(h / speed, initial=np.inf)
+
+        return float(np.clip(dt, self.dt_min, self.dt_max))
@@ -0,0 +1,107 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .engine import Engine
+
+
+class UpdateScheme:
+    name: str
+
+    def __init__(self, name: str):
+        """Constructor. Order of the particle-grid mappings and updates inside a time step.
+
+        Subclasses implement `step` with the mapping operations of `Engine`, so every scheme works with both the
+        scatter and the sparse mappings.
+
+        :param name: Name of the scheme.
+        """
+        self.name = name
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(name='{self.name}')"
+
+    def step(self, engine: 'Engine', dt: float | np.ndarray, node_dt: float | np.ndarray):
+        """Advance the particles of the engine by one time step. Shape functions are already evaluated.
+
+        :param engine: Engine with the state and the mapping operations.
+        :param dt: Time step, or time step of each particle.
+        :param node_dt: Time step, or time step of each node.
+        """
+        raise NotImplementedError
+
+
+class USL(UpdateScheme):
+    def __init__(self):
+        """Constructor. Update Stress Last: stresses are updated with the nodal velocities at the end of the step."""
+        super().__init__('usl')
+
+    def step(self, engine: 'Engine', dt: float | np.ndarray, node_dt: float | np.ndarray):
+        engine.map_mass_and_momentum()
+        engine.map_force()
+        engine.apply_constraints(node_dt)
+        engine.lap('p2g')
+
+        engine.grid.update_momentum(node_dt)
+        engine.lap('nodal_update')
+
+        engine.update_particles_from_nodes(dt)
+        engine.lap('g2p')
+
+        engine.update_stress(dt)
+        engine.lap('stress')
+
+
+class USF(UpdateScheme):
+    def __init__(self):
+        """Constructor. Update Stress First: stresses are updated with the nodal velocities of the beginning of the
+        step, before the internal forces are mapped."""
+        super().__init__('usf')
+
+    def step(self, engine: 'Engine', dt: float | np.ndarray, node_dt: float | np.ndarray):
+        engine.map_mass_and_momentum()
+        engine.apply_momentum_constraints()
+        engine.lap('p2g')
+
+        engine.update_stress(dt)
+        engine.lap('stress')
+
+        engine.map_force()
+        engine.apply_force_constraints(node_dt)
+        engine.lap('p2g')
+
+        engine.grid.update_momentum(node_dt)
+        engine.lap('nodal_update')
+
+        engine.update_particles_from_nodes(dt)
+        engine.lap('g2p')
+
+
+class MUSL(UpdateScheme):
+    def __init__(self):
+        """Constructor. Modified USL: the updated particle momentum is mapped again to the nodes and the stresses are
+        updated with those nodal velocities."""
+        super().__init__('musl')
+
+    def step(self, engine: 'Engine', dt: float | np.ndarray, node_dt: float | np.ndarray):
+        engine.map_mass_and_momentum()
+        engine.map_force()
+        engine.apply_constraints(node_dt)
+        engine.lap('p2g')
+
+        engine.grid.update_momentum(node_dt)
+        engine.lap('nodal_update')
+
+        engine.update_particles_from_nodes(dt)
+        engine.lap('g2p')
+
+        engine.map_momentum()
+        engine.apply_momentum_constraints(node_dt)
+        engine.lap('p2g')
+
+        engine.update_stress(dt)
+        engine.lap('stress')
+
+
+SCHEMES = {'usl': USL, 'usf': USF, 'musl': MUSL}